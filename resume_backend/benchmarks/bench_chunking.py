@@ -0,0 +1,77 @@
+"""Chunk counts and encode cost: chunk_text vs. token-budget packing.
+
+Run from resume_backend/:
+
+    python -m benchmarks.bench_chunking --real   # real tokenizer + encoder timings
+    python -m benchmarks.bench_chunking          # approximate token counts, no model needed
+
+Without --real, tokens are counted with a WordPiece-like regex and encode
+cost is estimated as padded tokens (batches of 32 padded to their longest
+chunk), which is what the encoder's time scales with.
+"""
+import argparse
+import re
+import time
+
+from benchmarks.bench_nlp_single_parse import build_corpus
+from coreengine.chunknizer import chunk_text, dedupe_chunks, iter_token_chunks
+
+BATCH_SIZE = 32
+WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_tokens(text: str) -> int:
+    return len(WORD_PIECES.findall(text))
+
+
+def padded_tokens(chunks: list[str], count_tokens) -> int:
+    total = 0
+    for start in range(0, len(chunks), BATCH_SIZE):
+        batch = chunks[start:start + BATCH_SIZE]
+        total += len(batch) * (max(count_tokens(chunk) for chunk in batch) + 2)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--real", action="store_true")
+    parser.add_argument("--resumes", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    count_tokens = approximate_tokens
+    if args.real:
+        from coreengine.engine import semantic_engine
+        count_tokens = semantic_engine.count_tokens
+
+    corpus = build_corpus(size=args.resumes)
+    modes = {
+        "chunk_text (300 chars)": lambda text: chunk_text(text),
+        "tokens 128": lambda text: list(dedupe_chunks(iter_token_chunks(text, count_tokens, 128))),
+        "tokens 256": lambda text: list(dedupe_chunks(iter_token_chunks(text, count_tokens, 256))),
+        "tokens 256, overlap 32": lambda text: list(dedupe_chunks(iter_token_chunks(text, count_tokens, 256, 32))),
+    }
+
+    print(f"{args.resumes} resumes" + ("" if args.real else " (approximate token counts)"))
+    for name, chunker in modes.items():
+        start = time.perf_counter()
+        per_resume = [chunker(text) for text in corpus]
+        chunk_ms = (time.perf_counter() - start) * 1000 / len(corpus)
+
+        chunks = sum(len(chunks) for chunks in per_resume)
+        too_long = sum(count_tokens(chunk) > 382 for chunks in per_resume for chunk in chunks)
+        cost = sum(padded_tokens(chunks, count_tokens) for chunks in per_resume)
+        line = (f"{name:24s} {chunks / len(corpus):6.1f} chunks/resume  {too_long:4d} truncated  "
+                f"{cost / len(corpus):8.0f} padded tokens/resume  chunking {chunk_ms:5.2f} ms")
+
+        if args.real:
+            from coreengine.engine import semantic_engine
+            semantic_engine._encode_model(per_resume[0])  # load
+            start = time.perf_counter()
+            for chunks in per_resume:
+                semantic_engine._encode_model(chunks)
+            line += f"  encode {(time.perf_counter() - start) * 1000 / len(corpus):7.1f} ms/resume"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Streaming DOCX extraction vs. python-docx on large, table-heavy documents.
+
+python-docx is given the same job (paragraphs plus every table cell) so the
+comparison is like for like. Each measurement runs in a fresh process and
+reports the peak RSS growth over the process after imports.
+
+Run from resume_backend/:  python -m benchmarks.bench_docx_extraction
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SIZES = {
+    "small": (60, 2, 10),      # paragraphs, tables, rows per table
+    "large": (3000, 40, 40),
+}
+
+
+def build_docx(path: str, paragraphs: int, tables: int, rows: int):
+    import docx
+    from benchmarks.bench_nlp_single_parse import LINES
+
+    document = docx.Document()
+    for index in range(paragraphs):
+        document.add_paragraph(LINES[index % len(LINES)])
+        if tables and index % (paragraphs // tables) == 0:
+            table = document.add_table(rows=rows, cols=4)
+            for row in table.rows:
+                for column, cell in enumerate(row.cells):
+                    cell.text = f"skill {column} python docker kubernetes"
+    document.save(path)
+
+
+def python_docx_text(path: str) -> str:
+    import docx
+
+    document = docx.Document(path)
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                parts.extend(paragraph.text for paragraph in cell.paragraphs)
+    return "\n".join(parts)
+
+
+def streaming_text(path: str) -> str:
+    from coreengine.extraction import iter_docx_text
+
+    return "\n".join(iter_docx_text(path))
+
+
+def measure(method: str, path: str):
+    import docx  # noqa: F401  (both sides pay for the import up front)
+    import coreengine.extraction  # noqa: F401
+
+    function = {"python-docx": python_docx_text, "streaming": streaming_text}[method]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    text = function(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "ms": round(elapsed * 1000, 1),
+        "peak_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024, 1),
+        "chars": len(text),
+    }))
+
+
+def main():
+    if len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (paragraphs, tables, rows) in SIZES.items():
+            path = os.path.join(tmp, f"{name}.docx")
+            build_docx(path, paragraphs, tables, rows)
+            print(f"{name}: {paragraphs} paragraphs, {tables} tables x {rows} rows x 4 cells, "
+                  f"{os.path.getsize(path) / 1024:.0f} KB")
+            for method in ("python-docx", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_docx_extraction", method, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                row = json.loads(output.strip().splitlines()[-1])
+                print(f"  {method:12s} {row['ms']:8.1f} ms  peak +{row['peak_mb']:6.1f} MB  {row['chars']} chars")
+
+
+if __name__ == "__main__":
+    main()
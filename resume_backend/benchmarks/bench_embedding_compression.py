@@ -0,0 +1,103 @@
+"""Accuracy vs. size of the compact embedding storage formats.
+
+For every storage level (float16, int8, PCA + float16/int8) this reports
+bytes per stored vector and how far compute_semantic_score moves against
+full float32 vectors. PCA is fitted on half of the resumes and evaluated on
+the other half.
+
+Run from resume_backend/:
+
+    python -m benchmarks.bench_embedding_compression --real   # mpnet on the benchmark corpus
+    python -m benchmarks.bench_embedding_compression          # synthetic, no encoder needed
+
+The synthetic vectors only have a decaying spectrum loosely like sentence
+embeddings; use --real for numbers that mean anything for PCA.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_encoder_backends import JDS
+from benchmarks.bench_nlp_single_parse import build_corpus
+from coreengine.chunknizer import chunk_text
+from coreengine.engine import semantic_engine
+from coreengine.quantization import compact_embeddings, pca_projection
+
+LEVELS = [
+    ("float32", None),
+    ("float16", None),
+    ("int8", None),
+    ("float16", 384),
+    ("int8", 384),
+    ("float16", 256),
+    ("int8", 256),
+    ("float16", 128),
+    ("int8", 128),
+]
+
+
+def synthetic_embeddings(sizes: list[int], dim: int = 768, seed: int = 3) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    basis = np.linalg.qr(rng.standard_normal((dim, dim)))[0]
+    spectrum = 1 / np.sqrt(np.arange(1, dim + 1))
+    topics = rng.standard_normal((12, dim)) * spectrum
+    result = []
+    for size in sizes:
+        rows = topics[rng.integers(len(topics), size=size)] + 0.7 * rng.standard_normal((size, dim)) * spectrum
+        rows = rows @ basis.T
+        result.append((rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32))
+    return result
+
+
+def real_embeddings(texts: list[list[str]]) -> list[np.ndarray]:
+    flat = [chunk for chunks in texts for chunk in chunks]
+    embeddings = semantic_engine.encode(flat)
+    result, offset = [], 0
+    for chunks in texts:
+        result.append(embeddings[offset:offset + len(chunks)])
+        offset += len(chunks)
+    return result
+
+
+def score(jd: np.ndarray, resume) -> float:
+    similarity = semantic_engine._cosine_matrix(jd, resume)
+    return float(np.mean((np.max(similarity, axis=1) + 1) / 2)) * 100
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--real", action="store_true", help="Encode the corpus with the configured encoder.")
+    parser.add_argument("--resumes", type=int, default=120)
+    args = parser.parse_args(argv)
+
+    resume_chunks = [chunk_text(text) for text in build_corpus(size=args.resumes)]
+    if args.real:
+        embedded = real_embeddings(resume_chunks + JDS)
+    else:
+        embedded = synthetic_embeddings([len(chunks) for chunks in resume_chunks + JDS])
+    resumes, jds = embedded[:len(resume_chunks)], embedded[len(resume_chunks):]
+
+    half = len(resumes) // 2
+    fit_rows = np.concatenate(resumes[:half])
+    evaluate = resumes[half:]
+    print(f"PCA fitted on {len(fit_rows)} chunks, evaluated on {sum(map(len, evaluate))} chunks x {len(jds)} JDs")
+
+    baseline = np.array([score(jd, resume) for resume in evaluate for jd in jds])
+    projections = {}
+
+    print(f"{'storage':10s} {'dims':>5s} {'bytes/vec':>10s} {'ratio':>7s} {'mean drift':>11s} {'max drift':>10s}")
+    for storage, dims in LEVELS:
+        projection = None
+        if dims:
+            projection = projections.setdefault(dims, pca_projection.fit(fit_rows, dims))
+        compact = [compact_embeddings.compress(resume, storage, projection) for resume in evaluate]
+        scores = np.array([score(jd, resume) for resume in compact for jd in jds])
+        drift = np.abs(scores - baseline)
+
+        bytes_per_vector = sum(c.nbytes for c in compact) / sum(len(c) for c in compact)
+        print(f"{storage:10s} {dims or 768:5d} {bytes_per_vector:10.0f} {768 * 4 / bytes_per_vector:6.1f}x "
+              f"{drift.mean():11.3f} {drift.max():10.3f}")
+
+
+if __name__ == "__main__":
+    main()
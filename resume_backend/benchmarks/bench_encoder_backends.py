@@ -0,0 +1,102 @@
+"""Speed, RSS and semantic-score drift of the int8 ONNX backend vs. fp32 torch.
+
+Export the ONNX model first (python -m coreengine.onnx_export).
+Run from resume_backend/:  python -m benchmarks.bench_encoder_backends
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_nlp_single_parse import build_corpus
+from coreengine.chunknizer import chunk_text
+from coreengine.jobdescription import get_default_jd
+
+JDS = [
+    get_default_jd(),
+    chunk_text("Backend engineer with Python, Django and PostgreSQL. Experience with Docker, "
+               "Kubernetes and AWS. Build REST APIs and own services in production."),
+    chunk_text("Data scientist comfortable with pandas, scikit-learn and SQL. Communicate "
+               "findings to stakeholders and run A/B tests."),
+]
+
+
+def corpus_texts():
+    resumes = [chunk_text(text) for text in build_corpus(size=30)]
+    return resumes, [chunk for resume in resumes for chunk in resume] + [line for jd in JDS for line in jd]
+
+
+def measure(backend: str, output: str):
+    from coreengine.encoders import create_encoder
+    from coreengine.engine import semantic_engine
+
+    _, texts = corpus_texts()
+    start = time.perf_counter()
+    encoder = create_encoder(backend, semantic_engine.MODEL_NAME)
+    load_time = time.perf_counter() - start
+
+    encoder.encode(texts[:8])
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts)
+    encode_time = time.perf_counter() - start
+
+    np.save(output, embeddings)
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_time, 2),
+        "ms_per_text": round(encode_time * 1000 / len(texts), 3),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def scores(embeddings: np.ndarray, resumes: list) -> np.ndarray:
+    lookup = {}
+    offset = 0
+    for index, resume in enumerate(resumes):
+        lookup[("resume", index)] = embeddings[offset:offset + len(resume)]
+        offset += len(resume)
+    for index, jd in enumerate(JDS):
+        lookup[("jd", index)] = embeddings[offset:offset + len(jd)]
+        offset += len(jd)
+
+    result = []
+    for r in range(len(resumes)):
+        for j in range(len(JDS)):
+            similarity = lookup[("jd", j)] @ lookup[("resume", r)].T
+            result.append(float(np.mean((similarity.max(axis=1) + 1) / 2)) * 100)
+    return np.array(result)
+
+
+def main():
+    if len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2])
+        return
+
+    resumes, _ = corpus_texts()
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("torch", "onnx"):
+            path = os.path.join(tmp, f"{backend}.npy")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_encoder_backends", backend, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            rows[backend] = json.loads(output.strip().splitlines()[-1])
+            rows[backend]["scores"] = scores(np.load(path), resumes)
+
+    for backend, row in rows.items():
+        print(f"{backend:6s} load {row['load_s']:6.2f}s  {row['ms_per_text']:7.3f} ms/text  "
+              f"max RSS {row['max_rss_mb']:7.1f} MB")
+
+    drift = np.abs(rows["onnx"]["scores"] - rows["torch"]["scores"])
+    print(f"speedup: {rows['torch']['ms_per_text'] / rows['onnx']['ms_per_text']:.2f}x")
+    print(f"semantic score drift (points): mean {drift.mean():.3f}, max {drift.max():.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Latency and throughput of direct vs. micro-batched encoding under concurrency.
+
+By default the encoder is synthetic: a fixed per-call cost plus a smaller
+per-text cost, with calls serialized the way concurrent forward passes
+contend for the same CPU cores. Pass --real to load the sentence-transformer
+instead.
+
+Run from resume_backend/:  python -m benchmarks.bench_encoder_batching [--real]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from coreengine.batcher import micro_batcher
+
+CALL_COST = 0.020
+TEXT_COST = 0.002
+REQUESTS = 200
+CHUNKS_PER_REQUEST = 4
+
+
+_cores = threading.Lock()
+
+
+def synthetic_encode(texts):
+    with _cores:
+        time.sleep(CALL_COST + TEXT_COST * len(texts))
+    return np.zeros((len(texts), 768), dtype=np.float32)
+
+
+def run(encode, concurrency: int):
+    latencies = []
+
+    def one_request(index):
+        texts = [f"request {index} chunk {n}" for n in range(CHUNKS_PER_REQUEST)]
+        start = time.perf_counter()
+        encode(texts)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "req_per_s": REQUESTS / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--real", action="store_true")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    if args.real:
+        from coreengine.engine import semantic_engine
+        encode = semantic_engine._encode_model
+        encode(["warm up"])
+    else:
+        encode = synthetic_encode
+
+    batcher = micro_batcher(encode, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+
+    print(f"{'mode':8s} {'conc':>5s} {'p50 ms':>9s} {'p99 ms':>9s} {'req/s':>8s}")
+    for concurrency in (1, 4, 16, 32):
+        for mode, fn in (("direct", encode), ("batched", batcher.encode)):
+            row = run(fn, concurrency)
+            print(f"{mode:8s} {concurrency:5d} {row['p50_ms']:9.1f} {row['p99_ms']:9.1f} {row['req_per_s']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
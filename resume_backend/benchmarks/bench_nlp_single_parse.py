@@ -0,0 +1,86 @@
+"""spaCy time per resume: separate fallback parse vs. one shared Doc.
+
+Uses resumes with few taxonomy skills so every one takes the fallback path,
+and reports how many resumes get different fallback skills from the two
+paths (they parse differently cased text, see nlp._phrases_from_doc).
+
+Run from resume_backend/:
+
+    python -m benchmarks.bench_nlp_single_parse           # needs en_core_web_sm
+    python -m benchmarks.bench_nlp_single_parse --blank   # tokenizer only
+"""
+import argparse
+import random
+import sys
+import time
+
+from coreengine.detection import detection, section_spans
+from coreengine.nlp import SPACY_MODEL, analyze_spacy, fallback_skill_detection, parse_document
+
+LINES = [
+    "Coordinated quarterly planning with stakeholders across three regions.",
+    "Maintained internal tooling for the finance team and wrote runbooks.",
+    "Reduced onboarding time by 30% through better documentation.",
+    "Worked closely with customers to gather requirements for new features.",
+    "Built reporting spreadsheets and automated weekly summaries.",
+    "Mentored two interns and reviewed their deliverables.",
+]
+
+
+def build_corpus(size: int = 50, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = ["EXPERIENCE"]
+        parts += rng.choices(LINES, k=rng.randint(10, 40))
+        parts.append("PROJECTS")
+        parts += rng.choices(LINES, k=rng.randint(5, 20))
+        parts.append("SKILLS")
+        parts.append("communication, stakeholder management, planning, excel")
+        corpus.append("\n".join(parts))
+    return corpus
+
+
+def separate(text: str):
+    section = detection(text)
+    analyze_spacy(text)
+    return fallback_skill_detection(section)
+
+
+def shared(text: str):
+    spans = section_spans(text)
+    section = detection(text, spans)
+    doc = parse_document(text, spans)
+    analyze_spacy(text, doc)
+    return fallback_skill_detection(section, doc)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blank", action="store_true", help="allow running without the spaCy model")
+    parser.add_argument("--resumes", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    import spacy.util
+
+    if not spacy.util.is_package(SPACY_MODEL):
+        if not args.blank:
+            sys.exit(f"{SPACY_MODEL} is not installed; install it, or pass --blank to measure spacy.blank.")
+        print(f"{SPACY_MODEL} not installed: measuring spacy.blank (tokenizer only)")
+
+    corpus = build_corpus(size=args.resumes)
+    shared(corpus[0])  # warm the pipeline and the matcher
+
+    outputs = {}
+    for name, fn in (("separate parses", separate), ("shared doc", shared)):
+        start = time.perf_counter()
+        outputs[name] = [fn(text) for text in corpus]
+        elapsed = time.perf_counter() - start
+        print(f"{name:16s} {elapsed * 1000 / len(corpus):8.2f} ms/resume")
+
+    differing = sum(a != b for a, b in zip(outputs["separate parses"], outputs["shared doc"]))
+    print(f"fallback skills differ on {differing}/{len(corpus)} resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""PDF extraction latency on 1-, 10- and 100-page documents.
+
+Compares the previous `text += page.get_text()` loop with the current
+extract_text_pdf, serial and page-parallel. Caps are lifted for the run.
+
+Run from resume_backend/:  python -m benchmarks.bench_pdf_extraction [--workers 4]
+"""
+import argparse
+import os
+import time
+
+import fitz
+
+from benchmarks.bench_nlp_single_parse import LINES
+from coreengine import extraction
+
+LINES_PER_PAGE = 45
+
+
+def build_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        lines = [LINES[(number * LINES_PER_PAGE + index) % len(LINES)] for index in range(LINES_PER_PAGE)]
+        page.insert_textbox(page.rect + (36, 36, -36, -36), "\n".join(lines), fontsize=9)
+    return doc.tobytes()
+
+
+def legacy_extract(data: bytes) -> str:
+    text = ''
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            text += page.get_text("text")
+    return text
+
+
+def timed(function, data: bytes, repeat: int) -> tuple:
+    function(data)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(data)
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    os.environ["PDF_MAX_PAGES"] = "0"
+    os.environ["PDF_MAX_CHARS"] = "0"
+    os.environ["PDF_WORKERS"] = str(args.workers)
+
+    print(f"{'pages':>5s} {'chars':>8s} {'legacy ms':>10s} {'serial ms':>10s} {'parallel ms':>12s}")
+    for pages in (1, 10, 100):
+        data = build_pdf(pages)
+        expected, legacy_ms = timed(legacy_extract, data, args.repeat)
+
+        os.environ["PDF_PARALLEL_MIN_PAGES"] = "0"
+        serial, serial_ms = timed(extraction.extract_text_pdf, data, args.repeat)
+
+        os.environ["PDF_PARALLEL_MIN_PAGES"] = "1"
+        parallel, parallel_ms = timed(extraction.extract_text_pdf, data, args.repeat)
+
+        assert serial == expected and parallel == expected
+        print(f"{pages:5d} {len(expected):8d} {legacy_ms:10.2f} {serial_ms:10.2f} {parallel_ms:12.2f}")
+
+    capped = build_pdf(100)
+    os.environ.update(PDF_PARALLEL_MIN_PAGES="0", PDF_MAX_PAGES="50", PDF_MAX_CHARS="20000")
+    _, capped_ms = timed(extraction.extract_text_pdf, capped, args.repeat)
+    print(f"100 pages with default page cap and a 20k character cap: {capped_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""JD -> top-k resume search latency and shortlist recall for vector_index.
+
+Uses synthetic unit vectors grouped around topic centres, so it runs
+without the encoder. Exact scores are checked against the max-sim formula
+of semantic_engine.compute_semantic_score.
+
+Run from resume_backend/:
+
+    python -m benchmarks.bench_resume_index [--resumes 20000] [--storage int8]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from coreengine.quantization import STORAGE_FORMATS, compact_embeddings
+from coreengine.vector_index import vector_index
+
+DIM = 768
+
+
+def unit(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def build(resumes: int, topics: int, rng, storage: str = "float16") -> tuple:
+    centres = unit(rng.standard_normal((topics, DIM)))
+    index = vector_index(DIM, storage)
+    stored = []
+    for key in range(resumes):
+        topic = rng.integers(topics)
+        chunks = unit(centres[topic] + 0.9 * rng.standard_normal((rng.integers(5, 25), DIM)) / np.sqrt(DIM) * 8)
+        compact = compact_embeddings.compress(chunks, storage)
+        index.add(key, compact)
+        stored.append(compact.vectors())  # what the reference score sees
+    return centres, index, stored
+
+
+def reference_score(jd: np.ndarray, chunks: np.ndarray) -> float:
+    normalized = (np.max(jd @ chunks.T, axis=1) + 1) / 2
+    return round(float(np.mean(normalized)) * 100, 2)
+
+
+def timed(index, jds, k, candidates):
+    results = []
+    start = time.perf_counter()
+    for jd in jds:
+        results.append(index.search(jd, k, candidates))
+    return results, (time.perf_counter() - start) * 1000 / len(jds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="float16")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    centres, index, stored = build(args.resumes, args.topics, rng, args.storage)
+    index.search(unit(rng.standard_normal((1, DIM))), 1)  # compaction
+    print(f"{args.resumes} resumes, {index.rows} chunk rows, built in {time.perf_counter() - start:.1f}s")
+    print(f"index: {args.storage}, {index.nbytes / 2**20:.0f} MiB "
+          f"(float32 would be {index.rows * DIM * 4 / 2**20:.0f} MiB)")
+
+    jds = [
+        unit(centres[rng.integers(args.topics)] + rng.standard_normal((8, DIM)) / np.sqrt(DIM) * 8).astype(np.float32)
+        for _ in range(args.queries)
+    ]
+
+    exact, exact_ms = timed(index, jds, args.k, None)
+    for jd, hits in zip(jds[:3], exact[:3]):
+        for key, score in hits:
+            assert abs(score - reference_score(jd, stored[key])) <= 0.01, (key, score)
+    print(f"exact: {exact_ms:.1f} ms/query")
+
+    for candidates in (250, 1000, 4000):
+        approx, approx_ms = timed(index, jds, args.k, candidates)
+        recall = np.mean([
+            len({key for key, _ in a} & {key for key, _ in e}) / len(e)
+            for a, e in zip(approx, exact)
+        ])
+        # Synthetic resumes of one topic are near-ties, so also report how
+        # far the shortlisted top-k falls behind the exact top-k in score.
+        gap = np.mean([
+            np.mean([score for _, score in e]) - np.mean([score for _, score in a])
+            for a, e in zip(approx, exact)
+        ])
+        print(f"shortlist {candidates}: {approx_ms:.1f} ms/query, recall@{args.k} {recall:.3f}, "
+              f"mean score gap {gap:.2f} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare the compiled skill matcher against the original per-variant scan.
+
+Run from resume_backend/:  python -m benchmarks.bench_skill_detection
+"""
+import random
+import re
+import time
+
+from coreengine.skill_db import SKILL_MAP
+from coreengine.detection import skill_detection
+from coreengine.taxonomy import normalize_text, collapser
+
+FILLER = (
+    "designed built maintained deployed optimized services for the team "
+    "with and using across production users data pipeline api platform "
+    "improved latency by 40% led migration of legacy systems to the cloud"
+).split()
+
+
+def legacy_skill_detection(sections: dict) -> dict:
+    relevant_data = (
+        sections.get("skills", "") + " " +
+        sections.get("experience", "") + " " +
+        sections.get("projects", "")
+    )
+    if not relevant_data:
+        return {}
+
+    soft_text = normalize_text(relevant_data)
+    tokens = soft_text.split()
+    collapsed_tokens = [collapser(t) for t in tokens]
+    detected_skill = {}
+
+    for category, skills in SKILL_MAP.items():
+        category_result = {}
+        for canonical, variants in skills.items():
+            count = 0
+            matched = False
+            for variant in variants:
+                soft_variant = normalize_text(variant)
+                matches = re.findall(rf"\b{re.escape(soft_variant)}\b", soft_text)
+                if matches:
+                    count += len(matches)
+                    matched = True
+                    break
+            if not matched:
+                for variant in variants:
+                    hard_variant = collapser(normalize_text(variant))
+                    if len(hard_variant) <= 3:
+                        continue
+                    if hard_variant in collapsed_tokens:
+                        count += 1
+                        break
+            if count > 0:
+                category_result[canonical] = count
+        if category_result:
+            detected_skill[category] = category_result
+    return detected_skill
+
+
+def build_corpus(size: int = 200, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    variants = [v for skills in SKILL_MAP.values() for vs in skills.values() for v in vs]
+    corpus = []
+    for _ in range(size):
+        def paragraph(words):
+            out = []
+            for _ in range(words):
+                roll = rng.random()
+                if roll < 0.15:
+                    out.append(rng.choice(variants))
+                elif roll < 0.18:
+                    # glued-together variants exercise the collapsed fallback
+                    out.append(rng.choice(variants).replace(" ", "").upper())
+                else:
+                    out.append(rng.choice(FILLER))
+            return " ".join(out)
+
+        corpus.append({
+            "skills": ", ".join(rng.sample(variants, rng.randint(5, 40))),
+            "experience": paragraph(rng.randint(100, 600)),
+            "projects": paragraph(rng.randint(50, 300)),
+        })
+    return corpus
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    results = [fn(sections) for sections in corpus]
+    return results, time.perf_counter() - start
+
+
+def main():
+    corpus = build_corpus()
+    skill_detection(corpus[0])  # build the matcher outside the timed loop
+
+    legacy, legacy_time = timed(legacy_skill_detection, corpus)
+    compiled, compiled_time = timed(skill_detection, corpus)
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b or list(a) != list(b))
+    print(f"documents: {len(corpus)}")
+    print(f"legacy:    {legacy_time * 1000 / len(corpus):8.2f} ms/doc")
+    print(f"compiled:  {compiled_time * 1000 / len(corpus):8.2f} ms/doc")
+    print(f"speedup:   {legacy_time / compiled_time:8.1f}x")
+    print(f"mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
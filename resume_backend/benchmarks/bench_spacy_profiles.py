@@ -0,0 +1,61 @@
+"""Load time, latency and peak RSS for each spaCy pipeline profile.
+
+Each profile is measured in a fresh subprocess so RSS is not shared.
+Needs en_core_web_sm: without it every profile would silently be spacy.blank.
+Run from resume_backend/:  python -m benchmarks.bench_spacy_profiles
+"""
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from coreengine.nlp import PIPELINE_PROFILES, SPACY_MODEL
+
+
+def measure(profile: str) -> dict:
+    from benchmarks.bench_nlp_single_parse import build_corpus
+    from coreengine.nlp import get_pipeline
+
+    corpus = build_corpus()
+    start = time.perf_counter()
+    pipeline = get_pipeline(profile)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in corpus:
+        pipeline(text)
+    parse_time = time.perf_counter() - start
+
+    return {
+        "profile": profile,
+        "components": pipeline.pipe_names,
+        "load_s": round(load_time, 3),
+        "ms_per_resume": round(parse_time * 1000 / len(corpus), 2),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    if len(sys.argv) == 2:
+        print(json.dumps(measure(sys.argv[1])))
+        return
+
+    import spacy.util
+
+    if not spacy.util.is_package(SPACY_MODEL):
+        sys.exit(f"{SPACY_MODEL} is not installed; the profiles would all be spacy.blank.")
+
+    print(f"{'profile':8s} {'load s':>8s} {'ms/resume':>10s} {'max RSS MB':>11s}  components")
+    for profile in PIPELINE_PROFILES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_spacy_profiles", profile],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        print(f"{row['profile']:8s} {row['load_s']:8.3f} {row['ms_per_resume']:10.2f} "
+              f"{row['max_rss_mb']:11.1f}  {','.join(row['components']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
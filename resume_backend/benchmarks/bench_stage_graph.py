@@ -0,0 +1,84 @@
+"""Wall-clock of process_resume: serial stages vs. the stage pool.
+
+Run from resume_backend/:
+
+    python -m benchmarks.bench_stage_graph --real   # configured encoder
+    python -m benchmarks.bench_stage_graph          # simulated encoder, no model needed
+
+Without --real the encoder is replaced by a sleep of --encode-ms per chunk,
+which like torch inference releases the GIL; spaCy, detection and
+extraction are the real ones. The chunk embedding cache is bypassed in
+both modes. Outputs of both modes are compared.
+"""
+import argparse
+import io
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_nlp_single_parse import build_corpus
+from coreengine import stages
+from coreengine.controller import process_resume
+from coreengine.engine import semantic_engine
+
+
+def simulated_encoder(encode_ms: float):
+    def encode(texts):
+        time.sleep(encode_ms * len(texts) / 1000)
+        rng = np.random.default_rng(len(texts))
+        vectors = rng.standard_normal((len(texts), 768)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return encode
+
+
+def docx_bytes(text: str) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def run(files: list[bytes], workers: int) -> tuple[float, list]:
+    os.environ["STAGE_WORKERS"] = str(workers)
+    results = []
+    start = time.perf_counter()
+    for data in files:
+        result = process_resume(data, ai_enabled=True, jd_requirements="Python backend developer, AWS", ext=".docx")
+        result["resume_embeddings"] = None  # compared separately from the scores
+        results.append(result)
+    return (time.perf_counter() - start) * 1000 / len(files), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--real", action="store_true")
+    parser.add_argument("--resumes", type=int, default=30)
+    parser.add_argument("--encode-ms", type=float, default=4.0)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    # Bypass the chunk embedding cache, or the second mode would only hit it.
+    semantic_engine.encode = semantic_engine._encode_uncached
+    if not args.real:
+        semantic_engine.encode = staticmethod(simulated_encoder(args.encode_ms))
+    files = [docx_bytes(text) for text in build_corpus(size=args.resumes)]
+    run(files[:2], 0)  # load models
+
+    serial_ms, serial = run(files, 0)
+    pooled_ms, pooled = run(files, args.workers)
+    if stages._pool is not None:
+        stages._pool.shutdown()
+
+    print(f"{args.resumes} resumes, {os.cpu_count()} CPU(s)" + ("" if args.real else f", simulated encoder {args.encode_ms} ms/chunk"))
+    print(f"serial       {serial_ms:8.1f} ms/resume")
+    print(f"{args.workers} workers    {pooled_ms:8.1f} ms/resume  ({serial_ms / pooled_ms:.2f}x)")
+    print(f"identical output: {serial == pooled}")
+
+
+if __name__ == "__main__":
+    main()
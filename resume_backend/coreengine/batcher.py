@@ -0,0 +1,77 @@
+from concurrent.futures import Future
+import os
+import queue
+import threading
+import time
+
+
+class micro_batcher:
+    """Coalesce concurrent encode calls into larger encoder batches.
+
+    Callers enqueue their texts and block on a future. A single worker
+    thread drains the queue until `max_batch` texts are collected or
+    `max_wait` seconds pass after the first one, runs one encode over
+    everything, and slices the result back to each caller.
+    """
+
+    def __init__(self,encode_fn,max_batch:int=64,max_wait:float=0.005):
+        self.encode_fn=encode_fn
+        self.max_batch=max_batch
+        self.max_wait=max_wait
+        self._lock=threading.Lock()
+        self._pid=None
+        self._queue=None
+        self._thread=None
+
+    def _ensure_worker(self):
+        # A thread started before a gunicorn fork does not exist in the
+        # child, so each process gets its own queue and worker.
+        pid=os.getpid()
+        if self._pid==pid:
+            return
+        with self._lock:
+            if self._pid==pid:
+                return
+            self._queue=queue.Queue()
+            self._thread=threading.Thread(target=self._run,args=(self._queue,),name="encoder-batcher",daemon=True)
+            self._thread.start()
+            self._pid=pid
+
+    def submit(self,texts:list[str])->Future:
+        self._ensure_worker()
+        future=Future()
+        self._queue.put((list(texts),future))
+        return future
+
+    def encode(self,texts:list[str]):
+        return self.submit(texts).result()
+
+    def _run(self,pending:queue.Queue):
+        while True:
+            batch=[pending.get()]
+            size=len(batch[0][0])
+            deadline=time.monotonic()+self.max_wait
+
+            while size<self.max_batch:
+                timeout=deadline-time.monotonic()
+                if timeout<=0:
+                    break
+                try:
+                    item=pending.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size+=len(item[0])
+
+            texts=[text for item_texts,_ in batch for text in item_texts]
+            try:
+                encoded=self.encode_fn(texts)
+            except Exception as e:
+                for _,future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset=0
+            for item_texts,future in batch:
+                future.set_result(encoded[offset:offset+len(item_texts)])
+                offset+=len(item_texts)
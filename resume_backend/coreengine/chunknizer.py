@@ -1,5 +1,16 @@
 import re 
-from typing import List
+import os
+from collections import deque
+from typing import Callable, Iterable, Iterator, List
+
+SENTENCE_END=re.compile(r'(?<=[.!?])\s+')
+
+# Lines that carry no signal about the candidate and would only add rows to
+# the similarity matrix.
+BOILERPLATE=re.compile(
+    r"^(references( are)? available (up)?on request|page \d+( of \d+)?|curriculum vitae|resume|cv)\W*$",
+    re.IGNORECASE
+)
 
 class chunkingerror(Exception):
     pass
@@ -52,4 +63,142 @@ def chunk_text(text:str,max_chars:int=300)->List[str]:
         return chunks
 
     except Exception as e:
-         raise chunkingerror("Chunking process failed") from e
\ No newline at end of file
+         raise chunkingerror("Chunking process failed") from e
+
+
+def iter_sentences(text:str)->Iterator[str]:
+    """Same sentences chunk_text splits on, without normalizing the whole text first."""
+    start=0
+    for match in SENTENCE_END.finditer(text):
+        sentence=" ".join(text[start:match.start()].split())
+        if sentence:
+            yield sentence
+        start=match.end()
+    sentence=" ".join(text[start:].split())
+    if sentence:
+        yield sentence
+
+
+def _split_word(word:str,count_tokens:Callable[[str],int],max_tokens:int)->Iterator[tuple]:
+    """(piece, tokens) for a word; words over the budget are cut into pieces that fit.
+
+    Long URLs, base64 and glued tokens would otherwise make one chunk that
+    the encoder silently truncates. Each cut is the longest prefix that
+    still fits, found by binary search on the token count.
+    """
+    tokens=count_tokens(word)
+    while tokens>max_tokens:
+        low,high=1,len(word)-1
+        while low<high:
+            middle=(low+high+1)//2
+            if count_tokens(word[:middle])<=max_tokens:
+                low=middle
+            else:
+                high=middle-1
+        yield word[:low],count_tokens(word[:low])
+        word=word[low:]
+        tokens=count_tokens(word)
+    if word:
+        yield word,tokens
+
+
+def _split_words(sentence:str,count_tokens:Callable[[str],int],max_tokens:int)->Iterator[str]:
+    # WordPiece never merges across whitespace, so per-word counts add up.
+    # Pieces of a cut word are joined with spaces, so they count the same.
+    words=[]
+    total=0
+    for word,tokens in (
+        piece for word in sentence.split(" ") for piece in _split_word(word,count_tokens,max_tokens)
+    ):
+        if words and total+tokens>max_tokens:
+            yield " ".join(words)
+            words=[]
+            total=0
+        words.append(word)
+        total+=tokens
+    if words:
+        yield " ".join(words)
+
+
+def iter_token_chunks(text:str,count_tokens:Callable[[str],int],max_tokens:int=256,overlap:int=0)->Iterator[str]:
+    """Pack whole sentences into chunks of at most max_tokens encoder tokens.
+
+    The last sentences of a chunk (up to `overlap` tokens) are repeated at
+    the start of the next one. Sentences longer than the budget are split
+    on word boundaries, and single words longer than it are cut.
+    """
+    if not isinstance(text,str):
+        raise chunkingerror("Input must be a string.")
+    if not isinstance(max_tokens,int) or max_tokens<=0:
+        raise chunkingerror("max_tokens must be a positive integer.")
+    if not isinstance(overlap,int) or not 0<=overlap<max_tokens:
+        raise chunkingerror("overlap must be between 0 and max_tokens.")
+
+    window=deque()
+    total=0
+
+    for sentence in iter_sentences(text):
+        tokens=count_tokens(sentence)
+
+        if tokens>max_tokens:
+            if window:
+                yield " ".join(part for part,_ in window)
+                window.clear()
+                total=0
+            yield from _split_words(sentence,count_tokens,max_tokens)
+            continue
+
+        if window and total+tokens>max_tokens:
+            yield " ".join(part for part,_ in window)
+            kept=deque()
+            kept_tokens=0
+            for part,part_tokens in reversed(window):
+                if kept_tokens+part_tokens>overlap or kept_tokens+part_tokens+tokens>max_tokens:
+                    break
+                kept.appendleft((part,part_tokens))
+                kept_tokens+=part_tokens
+            window=kept
+            total=kept_tokens
+
+        window.append((sentence,tokens))
+        total+=tokens
+
+    if window:
+        yield " ".join(part for part,_ in window)
+
+
+def dedupe_chunks(chunks:Iterable[str])->Iterator[str]:
+    """Drop repeated (case/whitespace-insensitive) and boilerplate chunks."""
+    seen=set()
+    for chunk in chunks:
+        key=" ".join(chunk.lower().split())
+        if key in seen or not any(char.isalnum() for char in key) or BOILERPLATE.match(key):
+            continue
+        seen.add(key)
+        yield chunk
+
+
+def chunk_config()->str:
+    """Identifies the encoder_chunks settings, for cache keys."""
+    if os.getenv("CHUNK_MODE","chars").lower()!="tokens":
+        return "chars"
+    return f"tokens-{os.getenv('CHUNK_MAX_TOKENS','256')}-{os.getenv('CHUNK_OVERLAP_TOKENS','0')}"
+
+
+def encoder_chunks(text:str)->List[str]:
+    """Chunks to embed for `text`, following CHUNK_MODE.
+
+    "chars" (default) is chunk_text. "tokens" packs sentences against the
+    encoder's tokenizer (CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS) and drops
+    duplicate and boilerplate chunks.
+    """
+    if os.getenv("CHUNK_MODE","chars").lower()!="tokens":
+        return chunk_text(text)
+
+    from coreengine.engine import semantic_engine
+
+    if not isinstance(text,str) or not text.strip():
+        return chunk_text(text)  # same errors as the character mode
+    max_tokens=min(int(os.getenv("CHUNK_MAX_TOKENS","256")),semantic_engine.MAX_SEQ_LENGTH-2)
+    overlap=int(os.getenv("CHUNK_OVERLAP_TOKENS","0"))
+    return list(dedupe_chunks(iter_token_chunks(text,semantic_engine.count_tokens,max_tokens,overlap)))
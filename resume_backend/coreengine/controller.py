@@ -1,66 +1,153 @@
-from coreengine.extraction import extract
-from coreengine.detection import detection,skill_detection,experience_signal_detection
-from coreengine.nlp import analyze_spacy,fallback_skill_detection
-from coreengine.evaluator import evaluate_resume
-from coreengine.chunknizer import chunk_text
+from coreengine.extraction import extract,content_hash,pdf_limits
+from coreengine.detection import detection,section_spans,skill_detection,experience_signal_detection
+from coreengine.nlp import parse_document,analyze_spacy,fallback_skill_detection
+from coreengine.evaluator import evaluate_resume,evaluate_skill
+from coreengine.chunknizer import encoder_chunks,chunk_config
 from coreengine.engine import semantic_engine
 from coreengine.matcher import compute_jd_match
-from coreengine.jobdescription import get_jd_text,get_default_jd
+from coreengine.jobdescription import get_jd_text,get_jd_text_batch,get_default_jd
+from coreengine.skill_matcher import get_skill_matcher
+from coreengine.registry import model_registry
+from coreengine.skill_embeddings import embedding_match_enabled
+from coreengine.stages import stage_graph,stage_pool
+from coreengine import metrics,result_cache
 FALLBACK_THRESHOLD=4
-def process_resume(file_path:str,ai_enabled:bool=False,jd_requirements:str | None = None)->dict:
 
-    text=extract(file_path)
+def register_models():
+    """Register every engine loader with model_registry (safe to repeat).
 
-    if not text or not text.strip():
-        return {"error":"No text extracted from the resume."}
-    
-    section=detection(text)
+    The encoder and spaCy loaders register when their modules are imported,
+    which importing this module already did.
+    """
+    model_registry.register(
+        "default_jd_embeddings",
+        lambda: semantic_engine.precomputed_embeddings(get_default_jd())
+    )
 
-    rule_skills=skill_detection(section)
-    spacy_metrics=analyze_spacy(text)
-    experience=experience_signal_detection(text)
 
-    evaluation=evaluate_resume(rule_skills,spacy_metrics,experience)
+register_models()
 
-    skill_score=evaluation["skill_metrics"]["total_unique"]
+def _timed_extract(file_path,ext:str | None)->str:
+    with metrics.timer(metrics.STAGE_SECONDS,stage="extract"):
+        return extract(file_path,ext)
 
-    if skill_score<FALLBACK_THRESHOLD:
-        fallback_skills=fallback_skill_detection(section)
 
-        for category,skills in fallback_skills.items():
-            if category not in rule_skills:
-                rule_skills[category]=skills
-            else:
-                for skill,count in skills.items():
-                    if skill not in rule_skills[category]:
-                        rule_skills[category][skill]=count
+def extract_text(file_path,ext:str | None=None,file_hash:str | None=None)->str:
+    """extract(), cached by file content (the "text" result cache layer)."""
+    if not result_cache.enabled():
+        return _timed_extract(file_path,ext)
+    limits=pdf_limits()
+    return result_cache.cached(
+        "text",
+        (file_hash or content_hash(file_path),(ext or "").lower(),limits["max_pages"],limits["max_chars"]),
+        lambda: _timed_extract(file_path,ext)
+    )
 
-    evaluation=evaluate_resume(rule_skills,spacy_metrics,experience)
-    rule_score=evaluation["rule_score"]
-    confidence=evaluation["confidence"]
-    experience_score=evaluation["experience_score"]
-    
-    semanetic_score=None
-    final_score=rule_score
 
-    if ai_enabled:
-        if  jd_requirements:
-            jd_requirements=chunk_text(jd_requirements)
+def _merge_skills(rule_skills:dict,fallback_skills:dict | None)->dict:
+    for category,skills in (fallback_skills or {}).items():
+        if category not in rule_skills:
+            rule_skills[category]=skills
         else:
-            jd_requirements=get_default_jd()
-        resume_chunk=chunk_text(text)
+            for skill,count in skills.items():
+                if skill not in rule_skills[category]:
+                    rule_skills[category][skill]=count
+    return rule_skills
+
+
+def _needs_fallback(rule_metrics:dict)->bool:
+    return rule_metrics["total_unique"]<FALLBACK_THRESHOLD
+
+
+def _fallback_skills(sections:dict,doc,rule_metrics:dict,matcher)->dict | None:
+    if not _needs_fallback(rule_metrics):
+        metrics.inc(metrics.ANALYSES,path="rules")
+        return None
+    metrics.inc(metrics.ANALYSES,path="fallback")
+    return fallback_skill_detection(sections,doc,matcher)
+
+
+def add_analysis_stages(graph:stage_graph,matcher)->stage_graph:
+    """Stages from "text" to "analysis", the analyze_text result.
+
+    Section and skill detection are cheap and run inline. The spaCy parse
+    and the experience regexes run in the pool, side by side with the
+    encoder stages. The parse waits for the skill count, which decides
+    whether it needs the full pipeline.
+    """
+    graph.add("spans",section_spans,"text",inline=True)
+    graph.add("sections",detection,"text","spans",inline=True)
+    graph.add("rule_skills",lambda sections: skill_detection(sections,matcher),"sections",inline=True)
+    graph.add("rule_metrics",evaluate_skill,"rule_skills",inline=True)
+    graph.add("experience",experience_signal_detection,"text")
 
-        semanetic_score=semantic_engine.compute_semantic_score(resume_chunk,jd_requirements)
-        
+    # Only pay for the dependency parser when noun chunks will be needed.
+    graph.add(
+        "doc",
+        lambda text,spans,rule_metrics: parse_document(text,spans,"full" if _needs_fallback(rule_metrics) else "metrics"),
+        "text","spans","rule_metrics"
+    )
+    graph.add("spacy_metrics",analyze_spacy,"text","doc",inline=True)
+    graph.add(
+        "fallback_skills",
+        lambda sections,doc,rule_metrics: _fallback_skills(sections,doc,rule_metrics,matcher),
+        "sections","doc","rule_metrics"
+    )
+    graph.add("skills",_merge_skills,"rule_skills","fallback_skills",inline=True)
+
+    # Without fallback skills the metrics from rule detection still hold.
+    graph.add(
+        "evaluation",
+        lambda skills,spacy_metrics,experience,fallback_skills,rule_metrics: evaluate_resume(
+            skills,spacy_metrics,experience,None if fallback_skills else rule_metrics
+        ),
+        "skills","spacy_metrics","experience","fallback_skills","rule_metrics",
+        inline=True
+    )
+    graph.add(
+        "analysis",
+        lambda sections,skills,spacy_metrics,experience,evaluation: {
+            "sections": sections,
+            "skills": skills,
+            "spacy_metrics": spacy_metrics,
+            "experience": experience,
+            "evaluation": evaluation,
+            "taxonomy_version": matcher.version
+        },
+        "sections","skills","spacy_metrics","experience","evaluation",
+        inline=True
+    )
+    return graph
+
+
+def analyze_text(text:str,matcher=None)->dict:
+    # Pin one taxonomy version for the whole request, even if a reload lands mid-way.
+    graph=add_analysis_stages(stage_graph(),matcher or get_skill_matcher())
+    return graph.run({"text":text},stage_pool())["analysis"]
+
+
+def analysis_cache_key(matcher,text_hash:str)->tuple:
+    return (matcher.version,int(embedding_match_enabled()),text_hash)
+
+
+def semantic_cache_key(text_hash:str,jd_hash:str)->tuple:
+    return (semantic_engine.cache_namespace(),chunk_config(),text_hash,jd_hash)
+
+
+def compute_final_score(evaluation:dict,experience:dict,semantic_score:float | None)->float:
+    rule_score=evaluation["rule_score"]
+    experience_score=evaluation["experience_score"]
+
+    if semantic_score is not None:
         if experience.get("years_experience", 0) <= 0:
             final_score = (
                 0.7 * rule_score +
-                0.3 * semanetic_score
+                0.3 * semantic_score
             )
         else:
             final_score = (
                 0.4 * rule_score +
-                0.2 * semanetic_score +
+                0.2 * semantic_score +
                 0.4 * experience_score
             )
     else:
@@ -71,16 +158,147 @@ def process_resume(file_path:str,ai_enabled:bool=False,jd_requirements:str | Non
                 0.6 * rule_score +
                 0.4 * experience_score
             )
+    return round(final_score, 2)
+
+
+def process_resume(file_path,ai_enabled:bool=False,jd_requirements:str | None = None,ext:str | None=None,file_hash:str | None=None)->dict:
+    # file_path may also be bytes or a file-like upload (see extraction.extract);
+    # file_hash, when the caller already has it, saves hashing the file again.
+    text=extract_text(file_path,ext,file_hash)
+
+    if not text or not text.strip():
+        return {"error":"No text extracted from the resume."}
+    
+    text_hash=result_cache.digest(text)
+    # Pin one taxonomy version for the whole request, even if a reload lands mid-way.
+    matcher=get_skill_matcher()
+    analysis_key=analysis_cache_key(matcher,text_hash)
+    analysis=result_cache.lookup("analysis",analysis_key)
+
+    # Encoding needs only the text, so it runs alongside the analysis.
+    graph=stage_graph()
+    if ai_enabled:
+        semantic_key=semantic_cache_key(text_hash,result_cache.digest(jd_requirements or "\n".join(get_default_jd())))
+        cached_score=result_cache.lookup("semantic",semantic_key)
+
+        graph.add("resume_chunks",encoder_chunks,"text",inline=True)
+        # Still needed on a cache hit: they are stored for JD search, and
+        # come from the chunk embedding cache for a text seen before.
+        graph.add("resume_embeddings",lambda chunks: semantic_engine.encode(chunks) if chunks else None,"resume_chunks")
+        if cached_score is None:
+            if jd_requirements:
+                graph.add("jd_chunks",lambda: encoder_chunks(jd_requirements),inline=True)
+                graph.add("jd_embeddings",lambda chunks: semantic_engine.encode(chunks) if chunks else None,"jd_chunks")
+            else:
+                graph.add("jd_chunks",get_default_jd,inline=True)
+                graph.add("jd_embeddings",lambda: model_registry.get("default_jd_embeddings"))
+            graph.add(
+                "semantic_score",semantic_engine.compute_semantic_score,
+                "resume_chunks","jd_chunks","jd_embeddings","resume_embeddings",
+                inline=True
+            )
+    if analysis is None:
+        add_analysis_stages(graph,matcher)
+
+    values=graph.run({"text":text},stage_pool())
+
+    if analysis is None:
+        analysis=values["analysis"]
+        result_cache.store("analysis",analysis_key,analysis)
+    evaluation=analysis["evaluation"]
+
+    semanetic_score=None
+    resume_embeddings=None
+
+    if ai_enabled:
+        resume_embeddings=values["resume_embeddings"]
+        semanetic_score=cached_score
+        if semanetic_score is None:
+            semanetic_score=values["semantic_score"]
+            result_cache.store("semantic",semantic_key,semanetic_score)
 
     return {
-        "sections": section,
-        "skills": rule_skills,
-        "spacy_metrics": spacy_metrics,
+        "sections": analysis["sections"],
+        "skills": analysis["skills"],
+        "spacy_metrics": analysis["spacy_metrics"],
         "evaluation": evaluation,
         "semantic_score": semanetic_score,
-        "experience_score": experience_score,
-        "final_score": round(final_score, 2),
-        "confidence": confidence
+        "experience_score": evaluation["experience_score"],
+        "final_score": compute_final_score(evaluation,analysis["experience"],semanetic_score),
+        "confidence": evaluation["confidence"],
+        "taxonomy_version": analysis["taxonomy_version"],
+        "resume_embeddings": resume_embeddings
+    }
+
+
+def process_resume_multi_jd(file_path,jd_texts:list[str],ai_enabled:bool=False,ext:str | None=None)->dict:
+    """Analyze one resume once and score it against every JD in jd_texts.
+
+    The resume is encoded a single time and all JD chunks go through the
+    encoder together (see semantic_engine.compute_semantic_scores); JDs
+    already scored against this text come from the result cache.
+    """
+    text=extract_text(file_path,ext)
+
+    if not text or not text.strip():
+        return {"error":"No text extracted from the resume."}
+
+    text_hash=result_cache.digest(text)
+    matcher=get_skill_matcher()
+    analysis_key=analysis_cache_key(matcher,text_hash)
+    analysis=result_cache.lookup("analysis",analysis_key)
+
+    graph=stage_graph()
+    graph.add("jd_infos",lambda: get_jd_text_batch(jd_texts))
+    if ai_enabled:
+        # Only JDs without a cached score go through the encoder.
+        keys=[semantic_cache_key(text_hash,result_cache.digest(jd_text)) for jd_text in jd_texts]
+        semantic_scores=result_cache.get_many("semantic",keys)
+        missing=[index for index,score in enumerate(semantic_scores) if score is None]
+        if missing:
+            graph.add(
+                "missing_scores",
+                lambda text: semantic_engine.compute_semantic_scores(
+                    encoder_chunks(text),
+                    [encoder_chunks(jd_texts[index]) for index in missing]
+                ),
+                "text"
+            )
+    else:
+        semantic_scores=[None]*len(jd_texts)
+    if analysis is None:
+        add_analysis_stages(graph,matcher)
+
+    values=graph.run({"text":text},stage_pool())
+
+    if analysis is None:
+        analysis=values["analysis"]
+        result_cache.store("analysis",analysis_key,analysis)
+    evaluation=analysis["evaluation"]
+
+    if "missing_scores" in graph:
+        for index,score in zip(missing,values["missing_scores"]):
+            semantic_scores[index]=score
+        result_cache.set_many("semantic",[(keys[index],semantic_scores[index]) for index in missing])
+
+    jd_results=[]
+    for index,(jd_info,semantic_score) in enumerate(zip(values["jd_infos"],semantic_scores)):
+        match=compute_jd_match(analysis["skills"],jd_info.get("extracted_skills",{}))
+        jd_results.append({
+            "index": index,
+            "semantic_score": semantic_score,
+            "final_score": compute_final_score(evaluation,analysis["experience"],semantic_score),
+            **match
+        })
+
+    return {
+        "sections": analysis["sections"],
+        "skills": analysis["skills"],
+        "evaluation": evaluation,
+        "experience_score": evaluation["experience_score"],
+        "confidence": evaluation["confidence"],
+        "taxonomy_version": analysis["taxonomy_version"],
+        "jd_scores": jd_results
     }
 
 
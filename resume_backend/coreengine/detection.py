@@ -1,4 +1,5 @@
-from coreengine.skill_db import SKILL_MAP
+from coreengine.skill_matcher import get_skill_matcher
+from coreengine.taxonomy import normalize_text
 import re
 
 
@@ -41,13 +42,16 @@ def is_likely_section_header(line:str)->bool:
 
 
 
-def detection(text:str)->dict:
-    section={key :""for key in section_keyword.keys()}
+def section_spans(text:str)->dict:
+    """Character offsets (start, end) of every content line, per section."""
+    spans={key :[] for key in section_keyword.keys()}
     current_section=None
+    offset=0
 
-    lines=text.split("\n")
+    for line in text.split("\n"):
+        line_start=offset
+        offset+=len(line)+1
 
-    for line in lines:
         stripped_line=line.strip()
         if not stripped_line:
             continue
@@ -62,24 +66,22 @@ def detection(text:str)->dict:
 
             continue
         if current_section and  stripped_line:
-            section[current_section]+=stripped_line+" "
+            start=line_start+len(line)-len(line.lstrip())
+            spans[current_section].append((start,start+len(stripped_line)))
 
-    return section
+    return spans
 
-def normalize_text(text:str)->str:
-    text = text.lower()
-    text = re.sub(r"[./_-]", " ", text)    
-    text = re.sub(r"[^\w\s]", "", text)     
-    text = re.sub(r"\s+", " ", text)   
-    return text.strip()
-
-
-def collapser(text:str)->str:
-    return text.replace(" ", "")
 
+def detection(text:str,spans:dict | None=None)->dict:
+    if spans is None:
+        spans=section_spans(text)
 
+    return {
+        section_name:"".join(text[start:end]+" " for start,end in ranges)
+        for section_name,ranges in spans.items()
+    }
 
-def skill_detection(sections:dict)->dict:
+def skill_detection(sections:dict,matcher=None)->dict:
     relevant_data=(
         sections.get("skills","")+" "+
         sections.get("experience","")+" "+
@@ -87,79 +89,46 @@ def skill_detection(sections:dict)->dict:
     )
     if not  relevant_data:
         return {}
-    # text_lower=relevant_data.lower()
-    # text_lower = re.sub(r"[-/]", " ", text_lower)
-    # text_lower = re.sub(r"\s+", " ", text_lower)
-    # # text_lower=normalize_text(relevant_data)
-    # # text_lower=collapser(text_lower)
-    # soft_text=normalize_text(relevant_data)
-    # hard_text=collapser(soft_text)
-    # detected_skill={}
-
-    # for category, skills in SKILL_MAP.items():
-    #     category_result = {}
-
-    #     for canonical, variants in skills.items():
-    #         count = 0
-    #         matched = False
-
-    #         for variant in variants:
-    #             variant_normalized = normalize_text(variant)
-    #             variant_collapsed = collapser(variant_normalized)
-
-    #             if variant_normalized in soft_text or variant_collapsed in hard_text:
-    #                 count += 1
-    #                 matched = True
-
-    #     #     for variant in variants:
-    #     #         pattern = rf"\b{re.escape(variant.lower())}\b"
-    #     #         matches = re.findall(pattern, text_lower)
-    #     #         count += len(matches)
-
-    #     #     if count > 0:
-    #     #         category_result[canonical] = count
-
-    #     # if category_result:
-    #     #     detected_skill[category] = category_result
 
     soft_text=normalize_text(relevant_data)
-    tokens = soft_text.split()
-    collapsed_tokens = [collapser(t) for t in tokens]
-    detected_skill={}
-
-    for category, skills in SKILL_MAP.items():
-        category_result={}
-
-        for canonical, variants in skills.items():
-            count=0
-            matched=False
-
-            for variant in variants:
-                soft_variant=normalize_text(variant)
-
-                pattern = rf"\b{re.escape(soft_variant)}\b"
-                matches = re.findall(pattern, soft_text)
-
-                if matches:
-                    count += len(matches)
-                    matched = True
-                    break
-            if not matched:
-                for variant in variants:
-                    soft_variant=normalize_text(variant)
-                    hard_variant=collapser(soft_variant)
-
-                    if len(hard_variant)<=3:
-                        continue
-                    if hard_variant in collapsed_tokens:
-                            count += 1
-                            break
-            if count > 0:
-                category_result[canonical] = count
-
-        if category_result:
-            detected_skill[category] = category_result
-    return detected_skill
+    matcher=matcher or get_skill_matcher()
+    return matcher.match(soft_text)
+
+
+def skill_detection_batch(sections_list:list[dict],matcher=None,return_matrix:bool=False):
+    """Run skill_detection over many documents with one pinned matcher.
+
+    With return_matrix=True also returns the document-by-skill count matrix
+    in COO form, (rows, cols, counts) int arrays with columns following
+    `matcher.skills` (the taxonomy skill ids); shape is
+    (len(sections_list), len(matcher.skills)).
+    """
+    matcher=matcher or get_skill_matcher()
+    results=[]
+    rows,cols,counts=[],[],[]
+
+    for row,sections in enumerate(sections_list):
+        relevant_data=(
+            sections.get("skills","")+" "+
+            sections.get("experience","")+" "+
+            sections.get("projects","")
+        )
+        skill_counts=matcher.skill_counts(normalize_text(relevant_data).split())
+        results.append(matcher.group(skill_counts))
+
+        if return_matrix:
+            for skill_id,count in skill_counts.items():
+                rows.append(row)
+                cols.append(skill_id)
+                counts.append(count)
+
+    if not return_matrix:
+        return results
+
+    import numpy as np
+
+    matrix=(np.asarray(rows,dtype=np.int64),np.asarray(cols,dtype=np.int64),np.asarray(counts,dtype=np.int32))
+    return results,matrix
 
 
 def experience_signal_detection(text:str)->dict:
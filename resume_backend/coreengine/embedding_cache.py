@@ -0,0 +1,313 @@
+"""Two-tier cache for chunk embeddings, keyed by model and chunk content.
+
+Memory tier: a bounded LRU of float32 vectors per process.
+Disk tier: one float16 matrix per model, memory-mapped, plus an append-only
+index log of "<key> <row>" lines. Rows are reused ring-buffer style once
+the configured capacity is reached, and the log is rewritten with only the
+live entries once it reaches twice that many lines, so it stays bounded.
+Workers share the disk tier; writes take an exclusive flock where the
+platform has one.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process locking
+    fcntl = None
+
+
+def embedding_cache_dir()->Path:
+    default=Path(os.getenv("HF_HOME") or Path.home()/".cache"/"huggingface")/"resume_backend"
+    return Path(os.getenv("EMBEDDING_CACHE_DIR") or default)
+
+
+def chunk_key(text:str)->str:
+    normalized=" ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+class embedding_cache:
+    def __init__(self,directory:Path,memory_items:int=4096,disk_items:int=50000):
+        self.directory=Path(directory)
+        self.memory_items=memory_items
+        self.disk_items=disk_items
+
+        self.hits=0
+        self.disk_hits=0
+        self.misses=0
+        self.evictions=0
+        self.disk_evictions=0
+
+        self._memory=OrderedDict()
+        self._lock=threading.Lock()
+        self._reset_disk_state()
+
+    @property
+    def _log_path(self)->Path:
+        return self.directory/"index.log"
+
+    @property
+    def _vectors_path(self)->Path:
+        return self.directory/"vectors.f16"
+
+    @property
+    def _meta_path(self)->Path:
+        return self.directory/"meta.json"
+
+    def _reset_disk_state(self):
+        self._entries={}      # key -> row, in write order
+        self._row_keys={}     # row -> key
+        self._next_row=0      # ring position: the row after the last write
+        self._log_lines=0
+        self._log_inode=None
+        self._log_offset=0
+        self._dim=None
+
+    # ---------------------------
+    # MEMORY TIER
+    # ---------------------------
+
+    def _remember(self,key:str,vector:np.ndarray):
+        self._memory[key]=vector
+        self._memory.move_to_end(key)
+        while len(self._memory)>self.memory_items:
+            self._memory.popitem(last=False)
+            self.evictions+=1
+
+    # ---------------------------
+    # DISK TIER
+    # ---------------------------
+
+    @contextmanager
+    def _file_lock(self,exclusive:bool):
+        if fcntl is None:
+            yield
+            return
+        self.directory.mkdir(parents=True,exist_ok=True)
+        with open(self.directory/"lock","a") as handle:
+            fcntl.flock(handle,fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle,fcntl.LOCK_UN)
+
+    def _apply(self,key:str,row:int):
+        previous=self._row_keys.get(row)
+        if previous is not None and previous!=key:
+            self._entries.pop(previous,None)
+        self._entries.pop(key,None)
+        self._entries[key]=row
+        self._row_keys[row]=key
+        self._next_row=(row+1)%max(self.disk_items,1)
+        self._log_lines+=1
+
+    def _sync(self):
+        # Replay whatever other workers appended to the index since last time.
+        try:
+            stat=os.stat(self._log_path)
+        except FileNotFoundError:
+            self._reset_disk_state()
+            return
+
+        if stat.st_ino!=self._log_inode or stat.st_size<self._log_offset:
+            self._reset_disk_state()
+            self._log_inode=stat.st_ino
+            try:
+                self._dim=json.loads(self._meta_path.read_text())["dim"]
+            except (OSError,ValueError,KeyError):
+                self._dim=None
+
+        if stat.st_size>self._log_offset:
+            with open(self._log_path,"rb") as handle:
+                handle.seek(self._log_offset)
+                data=handle.read(stat.st_size-self._log_offset)
+            complete=data.rfind(b"\n")+1
+            for line in data[:complete].splitlines():
+                key,row=line.decode("ascii").split()
+                self._apply(key,int(row))
+            self._log_offset+=complete
+
+    def _open_vectors(self,mode:str="r"):
+        rows=os.path.getsize(self._vectors_path)//(self._dim*2)
+        return np.memmap(self._vectors_path,dtype=np.float16,mode=mode,shape=(rows,self._dim))
+
+    def _read_disk(self,keys:list[str])->dict:
+        found={}
+        with self._file_lock(exclusive=False):
+            self._sync()
+            rows={key:self._entries[key] for key in keys if key in self._entries}
+            if not rows or self._dim is None:
+                return found
+            vectors=self._open_vectors()
+            for key,row in rows.items():
+                found[key]=np.asarray(vectors[row],dtype=np.float32)
+            del vectors
+        return found
+
+    def _write_disk(self,items:dict):
+        with self._file_lock(exclusive=True):
+            self._sync()
+            self.directory.mkdir(parents=True,exist_ok=True)
+
+            dim=len(next(iter(items.values())))
+            if self._dim is None:
+                self._dim=dim
+                self._meta_path.write_text(json.dumps({"dim":dim}))
+            elif self._dim!=dim:
+                return
+
+            new_items=[(key,vector) for key,vector in items.items() if key not in self._entries]
+            if not new_items:
+                return
+
+            rows=[]
+            lines=[]
+            for key,_ in new_items:
+                row=self._next_row
+                if row in self._row_keys:
+                    self.disk_evictions+=1
+                self._apply(key,row)
+                rows.append(row)
+                lines.append(f"{key} {row}\n")
+
+            needed=(max(rows)+1)*self._dim*2
+            with open(self._vectors_path,"ab") as handle:
+                if handle.tell()<needed:
+                    handle.truncate(needed)
+
+            vectors=self._open_vectors("r+")
+            vectors[rows]=np.asarray([vector for _,vector in new_items],dtype=np.float16)
+            vectors.flush()
+            del vectors
+
+            # Vectors first, index second: a reader never sees a row before its data.
+            with open(self._log_path,"ab") as handle:
+                handle.write("".join(lines).encode("ascii"))
+            if self._log_lines>=2*self.disk_items:
+                self._replace_log(self._entries.items())
+            stat=os.stat(self._log_path)
+            self._log_inode=stat.st_ino
+            self._log_offset=stat.st_size
+
+    def _replace_log(self,entries):
+        """Swap in a log holding only entries (key, row), oldest first.
+
+        Called under the exclusive lock; other processes see the new inode
+        on their next _sync and replay it from the start.
+        """
+        entries=list(entries)
+        fd,tmp_log=tempfile.mkstemp(dir=self.directory,suffix=".log")
+        with os.fdopen(fd,"w") as handle:
+            handle.writelines(f"{key} {row}\n" for key,row in entries)
+        os.replace(tmp_log,self._log_path)
+        self._log_lines=len(entries)
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def get_many(self,texts:list[str])->list:
+        """Cached vectors aligned with texts; None marks a miss."""
+        keys=[chunk_key(text) for text in texts]
+        result=[None]*len(keys)
+
+        with self._lock:
+            for index,key in enumerate(keys):
+                vector=self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    result[index]=vector
+
+            pending=[key for key,vector in zip(keys,result) if vector is None]
+            if pending and self.disk_items>0:
+                found=self._read_disk(pending)
+                for index,key in enumerate(keys):
+                    if result[index] is None and key in found:
+                        result[index]=found[key]
+                        self._remember(key,found[key])
+                        self.disk_hits+=1
+
+            misses=sum(1 for vector in result if vector is None)
+            self.misses+=misses
+            self.hits+=len(result)-misses
+        return result
+
+    def put_many(self,texts:list[str],embeddings:np.ndarray):
+        items={}
+        for text,vector in zip(texts,embeddings):
+            items[chunk_key(text)]=np.asarray(vector,dtype=np.float32)
+        if not items:
+            return
+
+        with self._lock:
+            for key,vector in items.items():
+                self._remember(key,vector)
+            if self.disk_items>0:
+                self._write_disk(items)
+
+    def disk_vectors(self)->np.ndarray:
+        """Every live disk entry as float32, e.g. to fit a projection on."""
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+            if self._dim is None or not self._entries:
+                return np.empty((0,self._dim or 0),dtype=np.float32)
+            vectors=self._open_vectors()
+            rows=np.fromiter(self._entries.values(),dtype=np.int64)
+            result=np.asarray(vectors[np.sort(rows)],dtype=np.float32)
+            del vectors
+        return result
+
+    def prune(self,max_items:int)->int:
+        """Keep only the newest max_items disk entries and compact the files."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync()
+            keep=list(self._entries.items())[-max_items:] if max_items>0 else []
+            if self._dim is None or not self._entries:
+                return 0
+
+            vectors=self._open_vectors()
+            kept=np.array([vectors[row] for _,row in keep],dtype=np.float16).reshape(len(keep),self._dim)
+            del vectors
+
+            fd,tmp_vectors=tempfile.mkstemp(dir=self.directory,suffix=".f16")
+            with os.fdopen(fd,"wb") as handle:
+                handle.write(kept.tobytes())
+
+            removed=len(self._entries)-len(keep)
+            os.replace(tmp_vectors,self._vectors_path)
+            self._replace_log((key,row) for row,(key,_) in enumerate(keep))
+            self._reset_disk_state()
+            self._sync()
+        return removed
+
+    def clear(self):
+        with self._lock, self._file_lock(exclusive=True):
+            self._memory.clear()
+            for path in (self._log_path,self._vectors_path,self._meta_path):
+                if path.exists():
+                    path.unlink()
+            self._reset_disk_state()
+
+    def stats(self)->dict:
+        with self._lock:
+            if self.disk_items>0:
+                with self._file_lock(exclusive=False):
+                    self._sync()
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "memory_items": len(self._memory),
+                "disk_items": len(self._entries),
+            }
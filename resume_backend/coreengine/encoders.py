@@ -0,0 +1,83 @@
+"""Sentence encoder backends for semantic_engine.
+
+Every backend exposes `encode(texts) -> np.ndarray` returning L2-normalized
+float32 rows, so the rest of the engine does not care which one is active.
+"""
+from pathlib import Path
+import os
+
+import numpy as np
+
+ONNX_MODEL_FILE = "model_quantized.onnx"
+
+
+class torch_encoder:
+    name = "torch"
+
+    def __init__(self,model_name:str):
+        from sentence_transformers import SentenceTransformer
+        self.model=SentenceTransformer(model_name)
+
+    def encode(self,texts:list[str])->np.ndarray:
+        return self.model.encode(texts, convert_to_numpy=True,
+                                 normalize_embeddings=True)
+
+
+class onnx_encoder:
+    """int8 ONNX Runtime export of the same model (see coreengine.onnx_export).
+
+    Reproduces the sentence-transformers head for mpnet: mean pooling over
+    the attention mask followed by L2 normalization.
+    """
+    name = "onnx-int8"
+
+    def __init__(self,model_dir:str | Path,max_length:int=384,batch_size:int=32):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir=Path(model_dir)
+        model_path=model_dir/ONNX_MODEL_FILE
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"{model_path} not found; run python -m coreengine.onnx_export --output {model_dir}"
+            )
+
+        options=ort.SessionOptions()
+        options.graph_optimization_level=ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads=os.getenv("ONNX_INTRA_OP_THREADS")
+        if threads:
+            options.intra_op_num_threads=int(threads)
+
+        self.tokenizer=AutoTokenizer.from_pretrained(model_dir)
+        self.session=ort.InferenceSession(str(model_path),options,providers=["CPUExecutionProvider"])
+        self.input_names={item.name for item in self.session.get_inputs()}
+        self.max_length=max_length
+        self.batch_size=batch_size
+
+    def encode(self,texts:list[str])->np.ndarray:
+        batches=[]
+        for start in range(0,len(texts),self.batch_size):
+            batch=texts[start:start+self.batch_size]
+            tokens=self.tokenizer(batch,padding=True,truncation=True,
+                                  max_length=self.max_length,return_tensors="np")
+            feeds={name:tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+            hidden=self.session.run(None,feeds)[0]
+
+            mask=tokens["attention_mask"][...,None].astype(np.float32)
+            pooled=(hidden*mask).sum(axis=1)/np.clip(mask.sum(axis=1),1e-9,None)
+            norms=np.linalg.norm(pooled,axis=1,keepdims=True)
+            batches.append((pooled/np.clip(norms,1e-12,None)).astype(np.float32))
+        return np.vstack(batches)
+
+
+def default_onnx_dir(model_name:str)->Path:
+    from coreengine.embedding_cache import embedding_cache_dir
+    return embedding_cache_dir()/"onnx"/model_name.replace("/","--")
+
+
+def create_encoder(backend:str,model_name:str):
+    if backend=="torch":
+        return torch_encoder(model_name)
+    if backend=="onnx":
+        return onnx_encoder(os.getenv("ONNX_MODEL_DIR") or default_onnx_dir(model_name))
+    raise ValueError(f"Unknown encoder backend: {backend}")
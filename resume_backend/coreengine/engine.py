@@ -1,37 +1,191 @@
 
 import numpy as np
+from coreengine.registry import model_registry
+from coreengine.embedding_cache import embedding_cache,embedding_cache_dir
+from coreengine.batcher import micro_batcher
+from coreengine.encoders import create_encoder
+from coreengine.sidecar import sidecar_encoder
+from coreengine.quantization import compact_embeddings,pca_projection
+import hashlib
+import os
+import tempfile
+import threading
+
 
 class semantic_engine:
     MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
-    _model = None
+    REGISTRY_NAME = "sentence_encoder"
+    TOKENIZER_NAME = "sentence_tokenizer"
+    MAX_SEQ_LENGTH = 384
+    _cache = None
+    _batcher = None
+    _projection = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def backend()->str:
+        return os.getenv("ENCODER_BACKEND","torch").lower()
+
+    @classmethod
+    def cache_namespace(cls)->str:
+        # int8 embeddings differ slightly from fp32 ones, so each backend
+        # keeps its own cached and precomputed vectors.
+        namespace=cls.MODEL_NAME.replace("/","--")
+        backend=cls.backend()
+        return namespace if backend=="torch" else f"{namespace}--{backend}"
+
+    @classmethod
+    def _create_model(cls):
+        socket_path=os.getenv("ENCODER_SOCKET")
+        if socket_path:
+            return sidecar_encoder(socket_path,lambda: create_encoder(cls.backend(),cls.MODEL_NAME))
+        return create_encoder(cls.backend(),cls.MODEL_NAME)
+
+    @classmethod
+    def _create_tokenizer(cls):
+        # Only the tokenizer, so chunking does not need the encoder (or the
+        # sidecar) to measure text.
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(cls.MODEL_NAME)
+
+    @classmethod
+    def count_tokens(cls,text:str)->int:
+        """Encoder tokens in text, excluding the special tokens."""
+        tokenizer=model_registry.get(cls.TOKENIZER_NAME)
+        return len(tokenizer(text,add_special_tokens=False)["input_ids"])
+
+    @classmethod
+    def cache(cls)->embedding_cache:
+        if cls._cache is None:
+            with cls._lock:
+                if cls._cache is None:
+                    cls._cache=embedding_cache(
+                        embedding_cache_dir()/cls.cache_namespace(),
+                        memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS","4096")),
+                        disk_items=int(os.getenv("EMBEDDING_CACHE_DISK_ITEMS","50000")),
+                    )
+        return cls._cache
+
+    @classmethod
+    def batcher(cls)->micro_batcher | None:
+        if os.getenv("ENCODER_BATCHING","False").lower() not in ("1","true","yes","on"):
+            return None
+        # One batcher per process, or concurrent first calls would split
+        # traffic between two batching threads.
+        if cls._batcher is None:
+            with cls._lock:
+                if cls._batcher is None:
+                    cls._batcher=micro_batcher(
+                        cls._encode_model,
+                        max_batch=int(os.getenv("ENCODER_MAX_BATCH","64")),
+                        max_wait=float(os.getenv("ENCODER_MAX_WAIT_MS","5"))/1000,
+                    )
+        return cls._batcher
+
+    @staticmethod
+    def storage()->str:
+        return os.getenv("EMBEDDING_STORAGE","float16").lower()
+
+    @classmethod
+    def projection_path(cls):
+        return os.getenv("EMBEDDING_PCA_PATH") or embedding_cache_dir()/f"{cls.cache_namespace()}-pca.npz"
+
+    @classmethod
+    def projection(cls)->pca_projection | None:
+        # PCA is opt-in: only used when EMBEDDING_PCA_DIMS is set and a fitted
+        # projection of that size exists.
+        dims=int(os.getenv("EMBEDDING_PCA_DIMS","0") or 0)
+        if not dims:
+            return None
+        if cls._projection is None or cls._projection.dims!=dims:
+            projection=pca_projection.load(cls.projection_path())
+            if projection.dims!=dims:
+                raise ValueError(f"{cls.projection_path()} has {projection.dims} components, EMBEDDING_PCA_DIMS is {dims}.")
+            cls._projection=projection
+        return cls._projection
 
     @classmethod
-    def _load_model(cls):
-        from sentence_transformers import SentenceTransformer
-        if cls._model is None:
-            cls._model = SentenceTransformer(cls.MODEL_NAME)
+    def compact(cls,embeddings:np.ndarray)->compact_embeddings:
+        """Storage form of encode() output for anything we keep around."""
+        return compact_embeddings.compress(embeddings,cls.storage(),cls.projection())
+
+    @classmethod
+    def _encode_model(cls,texts:list[str])->np.ndarray:
+        with model_registry.acquire(cls.REGISTRY_NAME) as model:
+            return model.encode(texts)
+
+    @classmethod
+    def _encode_uncached(cls,texts:list[str])->np.ndarray:
+        batcher=cls.batcher()
+        if batcher is None:
+            return cls._encode_model(texts)
+        return batcher.encode(texts)
 
     @classmethod
     def encode(cls,texts:list[str])->np.ndarray:
         if not texts:
             raise ValueError("Input list cannot be empty.")
-        
-        cls._load_model()
 
-        return cls._model.encode(texts, convert_to_numpy=True,
-                                 normalize_embeddings=True)
+        cache=cls.cache()
+        cached=cache.get_many(texts)
+        missing=[index for index,vector in enumerate(cached) if vector is None]
+
+        if missing:
+            # Repeated chunks within one call are encoded once.
+            unique=list(dict.fromkeys(texts[index] for index in missing))
+            encoded=cls._encode_uncached(unique)
+            cache.put_many(unique,encoded)
+            vectors=dict(zip(unique,encoded))
+            for index in missing:
+                cached[index]=vectors[texts[index]]
+
+        return np.stack(cached).astype(np.float32,copy=False)
     
+    @classmethod
+    def precomputed_embeddings(cls,texts:list[str])->np.ndarray:
+        """Embeddings for a fixed text list, persisted as .npy per model and text.
+
+        The file name hashes the model and backend together with the texts,
+        so changing any of them simply misses and recomputes.
+        """
+        key=hashlib.sha256("\n".join([cls.cache_namespace(),*texts]).encode("utf-8")).hexdigest()[:16]
+        path=embedding_cache_dir()/f"{cls.cache_namespace()}-{key}.npy"
+
+        try:
+            return np.load(path)
+        except (OSError,ValueError):
+            pass
+
+        # Persisted on its own, so kept out of the chunk embedding cache.
+        embeddings=cls._encode_uncached(texts)
+        try:
+            path.parent.mkdir(parents=True,exist_ok=True)
+            fd,tmp_path=tempfile.mkstemp(dir=path.parent,suffix=".npy")
+            with os.fdopen(fd,"wb") as handle:
+                np.save(handle,embeddings)
+            os.replace(tmp_path,path)
+        except OSError:
+            # The disk copy is only an optimisation; keep serving from memory.
+            pass
+        return embeddings
+
     @staticmethod
-    def _cosine_matrix(a:np.ndarray,b:np.ndarray)->np.ndarray:
+    def _cosine_matrix(a,b)->np.ndarray:
+        if isinstance(b,compact_embeddings):
+            return b.similarity(a)
+        if isinstance(a,compact_embeddings):
+            return a.similarity(b).T
         return np.dot(a,b.T)
     
     @classmethod
-    def compute_semantic_score(cls,resume_chunks:list[str],job_requirements:list[str])->float:
+    def compute_semantic_score(cls,resume_chunks:list[str],job_requirements:list[str],jd_embeddings:np.ndarray | None=None,resume_embeddings:np.ndarray | None=None)->float:
         if not resume_chunks or not job_requirements:
             return 0.0
         
-        resume_embeddings=cls.encode(resume_chunks)
-        jd_embeddings=cls.encode(job_requirements)
+        if resume_embeddings is None:
+            resume_embeddings=cls.encode(resume_chunks)
+        if jd_embeddings is None:
+            jd_embeddings=cls.encode(job_requirements)
 
         similarity_matrix=cls._cosine_matrix(jd_embeddings,resume_embeddings)
 
@@ -41,4 +195,40 @@ class semantic_engine:
 
         semantic_score = float(np.mean(normalized)) * 100
 
-        return round(semantic_score, 2)
\ No newline at end of file
+        return round(semantic_score, 2)
+
+    @classmethod
+    def compute_semantic_scores(cls,resume_chunks:list[str],jd_chunk_lists:list[list[str]])->list[float]:
+        """compute_semantic_score for many JDs with one encode and one matmul.
+
+        All JD chunks are stacked into a single block; per-JD scores are
+        segmented means over that block's row-wise max similarities.
+        """
+        if not resume_chunks:
+            return [0.0 for _ in jd_chunk_lists]
+
+        lengths=np.array([len(chunks) for chunks in jd_chunk_lists],dtype=np.int64)
+        flat=[chunk for chunks in jd_chunk_lists for chunk in chunks]
+        if not flat:
+            return [0.0 for _ in jd_chunk_lists]
+
+        resume_embeddings=cls.encode(resume_chunks)
+        jd_embeddings=cls.encode(flat)
+
+        similarity_matrix=cls._cosine_matrix(jd_embeddings,resume_embeddings)
+        normalized=(np.max(similarity_matrix,axis=1)+1)/2
+
+        non_empty=lengths>0
+        starts=np.concatenate(([0],np.cumsum(lengths)[:-1]))[non_empty]
+        sums=np.zeros(len(jd_chunk_lists))
+        sums[non_empty]=np.add.reduceat(normalized,starts)
+
+        scores=[]
+        for total,length in zip(sums,lengths):
+            scores.append(round(float(total/length)*100,2) if length else 0.0)
+        return scores
+
+
+
+model_registry.register(semantic_engine.REGISTRY_NAME,semantic_engine._create_model)
+model_registry.register(semantic_engine.TOKENIZER_NAME,semantic_engine._create_tokenizer)
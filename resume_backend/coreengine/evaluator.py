@@ -147,8 +147,10 @@ def compute_experience_score(exp_metrics: dict) -> float:
 
     return round(final * 100, 2)
 
-def evaluate_resume(skill_data: dict, spacy_metrics: dict, exp_metrics: dict) -> dict:
-    skill_metrics = evaluate_skill(skill_data)
+def evaluate_resume(skill_data: dict, spacy_metrics: dict, exp_metrics: dict, skill_metrics: dict | None = None) -> dict:
+    # skill_metrics: evaluate_skill(skill_data), when the caller already has it.
+    if skill_metrics is None:
+        skill_metrics = evaluate_skill(skill_data)
 
     rule_score = compute_rule_score(skill_metrics, spacy_metrics)
 
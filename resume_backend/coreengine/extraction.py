@@ -1,9 +1,38 @@
 import fitz
-import docx
+import hashlib
+import io
+import mmap
 import os
 import re
+import logging
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Iterator
+from xml.etree import ElementTree
+
+logger=logging.getLogger(__name__)
+
+BYTES_TYPES=(bytes,bytearray,memoryview,mmap.mmap)
+
+# File handles at least this large are memory-mapped instead of read.
+MMAP_THRESHOLD=1024*1024
+HASH_BLOCK_SIZE=1024*1024
+
+W_NAMESPACE="{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_PARAGRAPH=W_NAMESPACE+"p"
+W_TEXT=W_NAMESPACE+"t"
+W_TAB=W_NAMESPACE+"tab"
+W_BREAKS=(W_NAMESPACE+"br",W_NAMESPACE+"cr")
+MC_FALLBACK="{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCX_HEADER=re.compile(r"word/header\d*\.xml")
+DOCX_FOOTER=re.compile(r"word/footer\d*\.xml")
 
 def clean_text(text):  
+    if not isinstance(text,str):
+        text="\n".join(text)  # lines/paragraphs, e.g. from iter_docx_text
     text=text.replace('\xa0',' ')
     text=re.sub(r'\r\n|\r', '\n', text)
     text=re.sub(r'[ \t]+', ' ', text)
@@ -12,48 +41,277 @@ def clean_text(text):
 
 
 
+@contextmanager
+def _mapped(handle):
+    # Whole contents of a real file handle: memory-mapped when large.
+    size=os.fstat(handle.fileno()).st_size
+    if size<MMAP_THRESHOLD:
+        handle.seek(0)
+        yield handle.read()
+        return
+    with mmap.mmap(handle.fileno(),0,access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+@contextmanager
+def _open_pdf(source):
+    if isinstance(source,BYTES_TYPES):
+        with memoryview(source) as view, fitz.open(stream=view,filetype="pdf") as doc:
+            yield doc
+        return
+    with fitz.open(source) as doc:
+        yield doc
+
+
+def _doc_page_texts(doc,first:int,last:int,max_chars:int)->list[str]:
+    texts=[]
+    total=0
+    for number in range(first,last):
+        text=doc[number].get_text("text")
+        texts.append(text)
+        total+=len(text)
+        if max_chars and total>=max_chars:
+            break
+    return texts
+
+
+def _page_texts(source,first:int,last:int,max_chars:int)->list[str]:
+    with _open_pdf(source) as doc:
+        return _doc_page_texts(doc,first,last,max_chars)
+
+
+_pool=None
+_pool_pid=None
+_pool_lock=threading.Lock()
+
+
+def _page_pool(workers:int)->ProcessPoolExecutor:
+    # MuPDF is not thread-safe, so pages are split across processes. The
+    # pool is per process so a forked web worker never inherits one.
+    global _pool,_pool_pid
+    if _pool is None or _pool_pid!=os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid!=os.getpid():
+                # Not fork: the web worker is multi-threaded (stage pool,
+                # batcher, gthread), and a forked child can inherit a lock
+                # some other thread was holding.
+                methods=multiprocessing.get_all_start_methods()
+                context=multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _pool=ProcessPoolExecutor(max_workers=workers,mp_context=context)
+                _pool_pid=os.getpid()
+    return _pool
+
+
+def _parallel_page_texts(source,pages:int,max_chars:int,workers:int)->list[str]:
+    if not isinstance(source,str):
+        source=bytes(source)  # picklable copy for the workers
+    step=-(-pages//workers)
+    futures=[
+        _page_pool(workers).submit(_page_texts,source,first,min(first+step,pages),max_chars)
+        for first in range(0,pages,step)
+    ]
+    texts=[]
+    for future in futures:
+        texts.extend(future.result())
+    return texts
+
+
+def pdf_limits()->dict:
+    return {
+        "max_pages": int(os.getenv("PDF_MAX_PAGES","50")),
+        "max_chars": int(os.getenv("PDF_MAX_CHARS","200000")),
+        "parallel_min_pages": int(os.getenv("PDF_PARALLEL_MIN_PAGES","0")),
+        "workers": int(os.getenv("PDF_WORKERS","0")) or min(4,os.cpu_count() or 1),
+    }
+
+
 def extract_text_pdf(file_path):
-    # if not os.path.exists(file_path):
-    #     raise FileNotFoundError(f"File not found: {file_path}")
-    text=''
+    """Page texts joined once, within PDF_MAX_PAGES and PDF_MAX_CHARS.
+
+    Documents with at least PDF_PARALLEL_MIN_PAGES pages (0 = never) are
+    extracted across PDF_WORKERS processes.
+    """
+    limits=pdf_limits()
     try:
-        with fitz.open(file_path) as doc:
-            for page in doc:
-                text+=page.get_text("text")
+        with ExitStack() as stack:
+            source=file_path
+            if hasattr(source,"fileno"):
+                source=stack.enter_context(_mapped(source))
+
+            doc=stack.enter_context(_open_pdf(source))
+            page_count=len(doc)
+            pages=min(page_count,limits["max_pages"]) if limits["max_pages"] else page_count
+
+            if limits["parallel_min_pages"] and pages>=limits["parallel_min_pages"] and limits["workers"]>1:
+                texts=_parallel_page_texts(source,pages,limits["max_chars"],limits["workers"])
+            else:
+                texts=_doc_page_texts(doc,0,pages,limits["max_chars"])
     except Exception as e:        
         raise RuntimeError(f"Error processing PDF file: {e}")
+
+    text="".join(texts)
+    if pages<page_count or (limits["max_chars"] and len(text)>limits["max_chars"]):
+        logger.warning("PDF text truncated (%d of %d pages, %d character cap).",pages,page_count,limits["max_chars"])
+        text=text[:limits["max_chars"]] if limits["max_chars"] else text
     return text
 
 
 
+def _docx_parts(archive:zipfile.ZipFile)->list[str]:
+    # Headers first (name and contact details usually live there), then the
+    # body, then footers. A section can have up to three of each (default,
+    # first page, even pages), often with the same text.
+    names=archive.namelist()
+    headers=sorted(name for name in names if DOCX_HEADER.fullmatch(name))
+    footers=sorted(name for name in names if DOCX_FOOTER.fullmatch(name))
+    return headers+["word/document.xml"]+footers
+
+
+def _paragraph_text(paragraph)->str:
+    parts=[]
+    for node in paragraph.iter():
+        if node.tag==W_TEXT:
+            parts.append(node.text or "")
+        elif node.tag==W_TAB:
+            parts.append("\t")
+        elif node.tag in W_BREAKS:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _part_paragraphs(archive:zipfile.ZipFile,name:str)->Iterator[str]:
+    fallback_depth=0
+    with archive.open(name) as part:
+        for event,element in ElementTree.iterparse(part,events=("start","end")):
+            if element.tag==MC_FALLBACK:
+                fallback_depth+=1 if event=="start" else -1
+            elif event=="end" and element.tag==W_PARAGRAPH:
+                # Text boxes are stored twice; skip the legacy VML copy.
+                if not fallback_depth:
+                    yield _paragraph_text(element)
+                element.clear()
+
+
+def iter_docx_text(file_path)->Iterator[str]:
+    """Paragraph text of a DOCX, one paragraph at a time.
+
+    Reads the XML parts straight from the zip with an incremental parser, so
+    memory stays flat however long the document is. Table cells and text
+    boxes are paragraphs too, so they come out in document order; each one
+    is cleared once emitted so an enclosing paragraph does not repeat it.
+    Header and footer parts whose text was already emitted are skipped.
+    """
+    if isinstance(file_path,BYTES_TYPES):
+        file_path=io.BytesIO(file_path)
+
+    with zipfile.ZipFile(file_path) as archive:
+        seen=set()
+        for name in _docx_parts(archive):
+            if name=="word/document.xml":
+                yield from _part_paragraphs(archive,name)
+                continue
+            # Headers and footers are small; buffer them to compare.
+            paragraphs=tuple(_part_paragraphs(archive,name))
+            if paragraphs not in seen:
+                seen.add(paragraphs)
+                yield from paragraphs
+
+
 def extract_text_doc(file_path):
     # if not os.path.exists(file_path):
     #     raise FileNotFoundError(f"File not found: {file_path}")
-    text=""
     try:
-        para=docx.Document(file_path)
-
-        for p in para.paragraphs:
-            text+=p.text+'\n'
+        return "".join(paragraph+"\n" for paragraph in iter_docx_text(file_path))
     except Exception as e:        
         raise RuntimeError(f"Error processing DOCX file: {e}")
-    # para.close()
-    return text
 
 
 
-def extract(file_path):
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-    _,ext=os.path.splitext(file_path)
-    ext=ext.lower()
+def sniff_extension(data)->str:
+    header=bytes(data[:4])
+    if header==b"%PDF":
+        return ".pdf"
+    if header==b"PK\x03\x04":
+        return ".docx"
+    return ""
+
+
+@contextmanager
+def open_source(source):
+    """Path, bytes or file-like (e.g. an upload) -> something extract can read.
+
+    Paths and real file handles are passed through and read in place (large
+    PDFs memory-mapped); uploads Django already spooled to disk are opened
+    by their path, and in-memory ones are read once.
+    """
+    if isinstance(source,(str,os.PathLike)):
+        path=os.fspath(source)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        yield path
+        return
+
+    if isinstance(source,BYTES_TYPES):
+        yield source
+        return
+
+    if hasattr(source,"temporary_file_path"):
+        yield source.temporary_file_path()
+        return
+
+    if hasattr(source,"seek"):
+        source.seek(0)
+    try:
+        source.fileno()
+    except (AttributeError,OSError,io.UnsupportedOperation):
+        yield source.read()
+        return
+    # A real file: both parsers read it in place.
+    yield source
+
+
+def content_hash(file_path)->str:
+    """sha256 of the file's bytes, for a path, bytes or a file-like object."""
+    digest=hashlib.sha256()
+    with open_source(file_path) as source:
+        if isinstance(source,BYTES_TYPES):
+            digest.update(source)
+            return digest.hexdigest()
+        handle=open(source,"rb") if isinstance(source,str) else source
+        try:
+            for block in iter(lambda: handle.read(HASH_BLOCK_SIZE),b""):
+                digest.update(block)
+        finally:
+            if handle is not source:
+                handle.close()
+            else:
+                handle.seek(0)
+    return digest.hexdigest()
+
+
+def extract(file_path,ext=None):
+    """Text of a PDF or DOCX given as a path, bytes or a file-like object.
+
+    `ext` is taken from the path or the file's name when not given, and
+    sniffed from the content as a last resort.
+    """
+    name=os.fspath(file_path) if isinstance(file_path,(str,os.PathLike)) else getattr(file_path,"name",None)
+    if not ext and isinstance(name,str):
+        _,ext=os.path.splitext(name)
+    ext=(ext or "").lower()
 
+    with open_source(file_path) as source:
+        if not ext and isinstance(source,BYTES_TYPES):
+            ext=sniff_extension(source)
+        elif not ext and hasattr(source,"read"):
+            ext=sniff_extension(source.read(4))
+            source.seek(0)
 
-    if ext=='.pdf':
-        text=extract_text_pdf(file_path)
-    elif ext=='.docx':
-        text=extract_text_doc(file_path)
-    else:
-        raise ValueError(f"Unsupported file format: {ext}")
+        if ext=='.pdf':
+            text=extract_text_pdf(source)
+        elif ext=='.docx':
+            text=extract_text_doc(source)
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
 
     return clean_text(text)
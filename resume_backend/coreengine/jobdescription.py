@@ -1,4 +1,4 @@
-from coreengine.detection import skill_detection
+from coreengine.detection import skill_detection,skill_detection_batch
 
 def get_default_jd() -> list[str]:
     return [
@@ -27,4 +27,27 @@ def get_jd_text(jd_requirement: str | None) -> dict:
     return {
         'raw_text':jd_text,
         'extracted_skills':extracted_skills
-    }
\ No newline at end of file
+    }
+
+def get_jd_text_batch(jd_requirements: list[str | None]) -> list[dict]:
+    results=[{} for _ in jd_requirements]
+    jd_texts=[]
+    positions=[]
+
+    for index,jd_requirement in enumerate(jd_requirements):
+        if not jd_requirement or not jd_requirement.strip():
+            continue
+        jd_texts.append(jd_requirement.strip())
+        positions.append(index)
+
+    jd_sections=[
+        {'skills':jd_text,'experience':jd_text,'projects':''}
+        for jd_text in jd_texts
+    ]
+
+    for index,jd_text,extracted_skills in zip(positions,jd_texts,skill_detection_batch(jd_sections)):
+        results[index]={
+            'raw_text':jd_text,
+            'extracted_skills':extracted_skills
+        }
+    return results
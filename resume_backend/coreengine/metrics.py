@@ -0,0 +1,248 @@
+"""Counters and latency histograms, exposed in Prometheus text format.
+
+Code records with inc(), observe() and timer(). Each process keeps its own
+values. When METRICS_DIR is set, every process also writes them to
+<METRICS_DIR>/<pid>.json (at most once a second, and at exit) and render()
+sums the files of all processes, so whichever gunicorn worker serves
+/metrics reports the whole pool. Clear METRICS_DIR when the server starts,
+as with prometheus_client's multiprocess mode.
+
+While collect_timings() is active, timer() also adds each duration to that
+request's timings, including from stages running on the stage pool.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+import atexit
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+
+LATENCY_BUCKETS=(0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0,30.0)
+
+STAGE_SECONDS="resume_stage_seconds"
+REQUEST_SECONDS="resume_request_seconds"
+CACHE_REQUESTS="resume_result_cache_requests_total"
+ANALYSES="resume_analyses_total"
+ANALYSIS_REQUESTS="resume_analysis_requests_total"
+COALESCED_REQUESTS="resume_coalesced_requests_total"
+
+DEFINITIONS={
+    STAGE_SECONDS: ("histogram","Time spent in each analysis stage, including extraction and database writes."),
+    REQUEST_SECONDS: ("histogram","Analysis request latency by view."),
+    CACHE_REQUESTS: ("counter","Result cache lookups by layer and outcome."),
+    ANALYSES: ("counter","Analyses by skill detection path: rules only, or the spaCy fallback."),
+    ANALYSIS_REQUESTS: ("counter","Analysis requests by view and AI toggle."),
+    COALESCED_REQUESTS: ("counter","Requests answered with the result of an identical in-flight request."),
+}
+
+CONTENT_TYPE="text/plain; version=0.0.4; charset=utf-8"
+
+_timings=contextvars.ContextVar("metrics_timings",default=None)
+
+
+def metrics_dir()->Path | None:
+    directory=os.getenv("METRICS_DIR")
+    return Path(directory) if directory else None
+
+
+def _label_key(labels:dict)->tuple:
+    return tuple(sorted((name,str(value)) for name,value in labels.items()))
+
+
+class metrics_registry:
+    FLUSH_INTERVAL=1.0
+
+    def __init__(self,directory:Path | None=None):
+        self.directory=directory
+        self.pid=os.getpid()
+        self._counters={}     # (name, labels) -> value
+        self._histograms={}   # (name, labels) -> per-bucket counts + [sum, count]
+        self._lock=threading.Lock()
+        self._last_flush=0.0
+        if directory is not None:
+            atexit.register(self.flush)
+
+    def inc(self,name:str,value:float=1,**labels):
+        key=(name,_label_key(labels))
+        with self._lock:
+            self._counters[key]=self._counters.get(key,0)+value
+        self._maybe_flush()
+
+    def observe(self,name:str,value:float,**labels):
+        key=(name,_label_key(labels))
+        with self._lock:
+            histogram=self._histograms.get(key)
+            if histogram is None:
+                histogram=self._histograms[key]=[0]*(len(LATENCY_BUCKETS)+2)
+            index=bisect_left(LATENCY_BUCKETS,value)
+            if index<len(LATENCY_BUCKETS):
+                histogram[index]+=1
+            histogram[-2]+=value
+            histogram[-1]+=1
+        self._maybe_flush()
+
+    def snapshot(self)->dict:
+        with self._lock:
+            return {
+                "counters": [[name,labels,value] for (name,labels),value in self._counters.items()],
+                "histograms": [[name,labels,list(values)] for (name,labels),values in self._histograms.items()],
+            }
+
+    # ---------------------------
+    # SHARING ACROSS WORKERS
+    # ---------------------------
+
+    def _maybe_flush(self):
+        if self.directory is not None and time.monotonic()-self._last_flush>=self.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self.directory is None:
+            return
+        self._last_flush=time.monotonic()
+        tmp_path=None
+        try:
+            self.directory.mkdir(parents=True,exist_ok=True)
+            fd,tmp_path=tempfile.mkstemp(dir=self.directory,suffix=".tmp")
+            with os.fdopen(fd,"w") as handle:
+                json.dump(self.snapshot(),handle)
+            os.replace(tmp_path,self.directory/f"{self.pid}.json")
+        except OSError:
+            # Metrics must never fail a request; this worker's numbers are
+            # simply missing from /metrics until the next flush.
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _snapshots(self)->list[dict]:
+        if self.directory is None:
+            return [self.snapshot()]
+        self.flush()
+        snapshots=[]
+        for path in self.directory.glob("*.json"):
+            try:
+                with open(path) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError,ValueError):
+                continue
+        return snapshots
+
+    def collect(self)->tuple[dict,dict]:
+        """Counters and histograms summed over every process."""
+        counters={}
+        histograms={}
+        for snapshot in self._snapshots():
+            for name,labels,value in snapshot["counters"]:
+                key=(name,tuple(map(tuple,labels)))
+                counters[key]=counters.get(key,0)+value
+            for name,labels,values in snapshot["histograms"]:
+                key=(name,tuple(map(tuple,labels)))
+                total=histograms.setdefault(key,[0]*len(values))
+                for index,value in enumerate(values):
+                    total[index]+=value
+        return counters,histograms
+
+    # ---------------------------
+    # PROMETHEUS TEXT FORMAT
+    # ---------------------------
+
+    def render(self)->str:
+        counters,histograms=self.collect()
+        names=list(DEFINITIONS)
+        names+=sorted({name for name,_ in [*counters,*histograms]}-set(names))
+
+        lines=[]
+        for name in names:
+            kind,help_text=DEFINITIONS.get(name,("histogram" if any(key[0]==name for key in histograms) else "counter",""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind=="counter":
+                for (metric,labels),value in sorted(counters.items()):
+                    if metric==name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (metric,labels),values in sorted(histograms.items()):
+                if metric!=name:
+                    continue
+                cumulative=0
+                for bound,count in zip(LATENCY_BUCKETS,values):
+                    cumulative+=count
+                    lines.append(f"{name}_bucket{_format_labels(labels,le=repr(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels,le='+Inf')} {values[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+        return "\n".join(lines)+"\n"
+
+
+def _escape(value)->str:
+    return str(value).replace("\\","\\\\").replace('"','\\"').replace("\n","\\n")
+
+
+def _format_labels(labels:tuple,**extra)->str:
+    pairs=[*labels,*extra.items()]
+    if not pairs:
+        return ""
+    return "{"+",".join(f'{name}="{_escape(value)}"' for name,value in pairs)+"}"
+
+
+def _format_value(value:float)->str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_registry=None
+_lock=threading.Lock()
+
+
+def registry()->metrics_registry:
+    # Per process: a forked worker starts from zero rather than re-reporting
+    # what the master recorded before the fork.
+    global _registry
+    if _registry is None or _registry.pid!=os.getpid():
+        with _lock:
+            if _registry is None or _registry.pid!=os.getpid():
+                _registry=metrics_registry(metrics_dir())
+    return _registry
+
+
+def inc(name:str,value:float=1,**labels):
+    registry().inc(name,value,**labels)
+
+
+def observe(name:str,value:float,**labels):
+    registry().observe(name,value,**labels)
+
+
+def render()->str:
+    return registry().render()
+
+
+@contextmanager
+def timer(name:str,**labels):
+    """Observe the block's duration in seconds (and add it to the request's timings)."""
+    start=time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed=time.perf_counter()-start
+        observe(name,elapsed,**labels)
+        timings=_timings.get()
+        if timings is not None:
+            key=",".join(str(value) for value in labels.values()) or name
+            timings[key]=timings.get(key,0.0)+elapsed
+
+
+@contextmanager
+def collect_timings():
+    """Seconds per timer label recorded in this context, e.g. {"doc": 0.12}."""
+    timings={}
+    token=_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
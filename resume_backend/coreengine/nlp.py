@@ -1,19 +1,66 @@
-import spacy
 import re
-from coreengine.skill_db import SKILL_MAP
+from bisect import bisect_right
+from coreengine.registry import model_registry
+from coreengine.skill_matcher import get_skill_matcher
+from coreengine.taxonomy import normalize_phrase
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    nlp = spacy.blank("en")
+FALLBACK_SECTIONS=("skills","experience","projects")
 
-def analyze_spacy(text:str)->dict:
+SPACY_MODEL="en_core_web_sm"
+
+# Components excluded per profile; None means tokenizer only. POS tags come
+# from tagger + attribute_ruler, and the lemmatizer needs them too.
+PIPELINE_PROFILES={
+    "full": (),
+    "metrics": ("parser","lemmatizer"),
+    "chunks": ("ner",),
+    "tokens": None,
+}
+
+
+def _load_pipeline(exclude):
+    import spacy
+    if exclude is None:
+        return spacy.blank("en")
+    try:
+        return spacy.load(SPACY_MODEL,exclude=list(exclude))
+    except OSError:
+        return spacy.blank("en")
+
+
+for _profile,_exclude in PIPELINE_PROFILES.items():
+    model_registry.register(f"spacy:{_profile}",lambda exclude=_exclude: _load_pipeline(exclude))
+
+
+def get_pipeline(profile:str="full"):
+    """Load a profile on first use; it stays cached until idle-evicted."""
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown spaCy pipeline profile: {profile}")
+    return model_registry.get(f"spacy:{profile}")
+
+
+def run_pipeline(profile:str,text:str):
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown spaCy pipeline profile: {profile}")
+    with model_registry.acquire(f"spacy:{profile}") as pipeline:
+        return pipeline(text)
+
+
+def parse_document(text:str,spans:dict | None=None,profile:str="full"):
+    """Parse the full resume once; section offsets ride along in user_data."""
+    doc=run_pipeline(profile,text)
+    doc.user_data["section_spans"]=spans or {}
+    return doc
+
+
+def analyze_spacy(text:str,doc=None)->dict:
 
 
     if not text.strip():
         return {}
     
-    doc=nlp(text)
+    if doc is None:
+        doc=run_pipeline("metrics",text)
 
     noun_count=0
     verb_count=0
@@ -40,7 +87,75 @@ def analyze_spacy(text:str)->dict:
         "date_count": date_count
     }
 
-def fallback_skill_detection(sections:dict)->dict:
+def _in_spans(starts:list,ends:list,char:int)->bool:
+    index=bisect_right(starts,char)-1
+    return index>=0 and char<ends[index]
+
+
+def _phrases_from_doc(doc)->set:
+    # Deliberately not identical to the standalone path under the full model:
+    # that one parses the lowercased skills/experience/projects text with "-"
+    # and "/" replaced, while the shared doc is the original-case resume, so
+    # noun-chunk boundaries and lemmas can differ (case usually helps the
+    # tagger). Phrases are normalized afterwards either way; under
+    # spacy.blank the two paths give the same phrases.
+    # benchmarks/bench_nlp_single_parse.py reports how often the detected
+    # skills differ.
+    ranges=sorted(
+        span
+        for name in FALLBACK_SECTIONS
+        for span in doc.user_data.get("section_spans",{}).get(name,[])
+    )
+    starts=[start for start,_ in ranges]
+    ends=[end for _,end in ranges]
+
+    extracted_phrases=set()
+
+    noun_chunks = list(doc.noun_chunks) if doc.has_annotation("DEP") else []
+    if noun_chunks:
+        for chunks in noun_chunks:
+            if not _in_spans(starts,ends,chunks.start_char):
+                continue
+            lemma_phrase=" ".join([token.lemma_ for token in chunks])
+            extracted_phrases.add(normalize_phrase(lemma_phrase))
+    else:
+        token_list = []
+        for token in doc:
+            if not _in_spans(starts,ends,token.idx):
+                continue
+            # The standalone path splits on "-" and "/" before tokenizing;
+            # do the same split on the shared doc's tokens.
+            token_list.extend(normalize_phrase(token.text).split())
+
+        extracted_phrases.update(token_list)
+        for index in range(len(token_list) - 1):
+            extracted_phrases.add(f"{token_list[index]} {token_list[index + 1]}")
+
+    return extracted_phrases
+
+
+def _match_phrases(matcher,phrases:set)->dict:
+    detected=matcher.match_phrases(phrases)
+
+    from coreengine.skill_embeddings import embedding_match_enabled,get_skill_normalizer
+    if not embedding_match_enabled():
+        return detected
+
+    # Phrases the taxonomy does not know exactly go to the nearest skill by embedding.
+    unmatched=[phrase for phrase in phrases if phrase not in matcher.phrases]
+    extra=get_skill_normalizer(matcher).skill_counts(unmatched)
+    for category,skills in matcher.group(extra).items():
+        for skill,count in skills.items():
+            detected.setdefault(category,{}).setdefault(skill,count)
+    return detected
+
+
+def fallback_skill_detection(sections:dict,doc=None,matcher=None)->dict:
+    matcher=matcher or get_skill_matcher()
+    if doc is not None:
+        # Reuse the resume-wide parse instead of parsing the sections again.
+        return _match_phrases(matcher,_phrases_from_doc(doc))
+
     relevant_data=(
         sections.get("skills","")+" "+
         sections.get("experience","")+" "+
@@ -54,7 +169,7 @@ def fallback_skill_detection(sections:dict)->dict:
     text = re.sub(r"\s+", " ", text)
 
 
-    doc=nlp(text)
+    doc=run_pipeline("chunks",text)
 
     extracted_phrases=set()
 
@@ -75,31 +190,6 @@ def fallback_skill_detection(sections:dict)->dict:
         for index in range(len(token_list) - 1):
             extracted_phrases.add(f"{token_list[index]} {token_list[index + 1]}")
 
-    detected_skill={}
-    for category, skills in SKILL_MAP.items():
-        category_result = {}
-
-        for canonical, variants in skills.items():
-                matched = False
-
-            
-                if canonical.replace("_", " ") in extracted_phrases:
-                    matched = True
-
-                
-                for variant in variants:
-                    normalized_variant = variant.lower().strip()
-                    normalized_variant = re.sub(r"[-/]", " ", normalized_variant)
-                    normalized_variant = re.sub(r"\s+", " ", normalized_variant)
-
-                    if normalized_variant in extracted_phrases:
-                        matched = True
-                        break
-
-                if matched:
-                    category_result[canonical] = 1
-
-        if category_result:
-                detected_skill[category] = category_result
-
-    return detected_skill
\ No newline at end of file
+    # Phrase -> skill lookup is precomputed in the taxonomy artifact, so this
+    # costs one dict probe per extracted phrase.
+    return _match_phrases(matcher,extracted_phrases)
@@ -0,0 +1,63 @@
+"""Export the sentence encoder to ONNX and quantize it to int8 (offline step).
+
+    python -m coreengine.onnx_export [--output DIR]
+
+Needs torch, transformers and onnxruntime on the exporting machine only.
+The output directory holds model.onnx (fp32), model_quantized.onnx (int8
+dynamic quantization) and the tokenizer files used by onnx_encoder.
+"""
+from pathlib import Path
+import argparse
+
+from coreengine.encoders import ONNX_MODEL_FILE, default_onnx_dir
+from coreengine.engine import semantic_engine
+
+
+def export(model_name:str, output_dir:Path, opset:int=17)->Path:
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    sample = tokenizer(["export sample sentence"], return_tensors="pt")
+
+    fp32_path = output_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+        )
+
+    quantized_path = output_dir / ONNX_MODEL_FILE
+    quantize_dynamic(str(fp32_path), str(quantized_path), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(output_dir)
+    return quantized_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and int8-quantize the sentence encoder.")
+    parser.add_argument("--model", default=semantic_engine.MODEL_NAME)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args(argv)
+
+    output = Path(args.output) if args.output else default_onnx_dir(args.model)
+    path = export(args.model, output, args.opset)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Compact storage for sentence embeddings.
+
+A `compact_embeddings` block holds vectors as float32, float16, or int8 with
+one float32 scale per vector (symmetric, max-abs), optionally after a PCA
+projection fitted on our own chunk embeddings. Similarities are computed
+against the stored codes directly; nothing is expanded back to 768 dims.
+
+With a projection P (components) and mean m, a stored row is the code of
+P(x - m) and a query q scores
+
+    q.x  ~  (P q).(P(x - m)) + q.m
+
+which is exact for the PCA reconstruction of x.
+
+Fit a projection on the vectors in the embedding cache:
+
+    python -m coreengine.quantization --dims 256 [--output PATH]
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+STORAGE_FORMATS = ("float32", "float16", "int8")
+
+
+class pca_projection:
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)  # dims x source dim
+        digest = hashlib.sha256(self.mean.tobytes() + self.components.tobytes())
+        self.version = f"pca{len(self.components)}-{digest.hexdigest()[:12]}"
+
+    @property
+    def dims(self) -> int:
+        return len(self.components)
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, dims: int, sample: int = 50000, seed: int = 0):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) > sample:
+            rows = np.random.default_rng(seed).choice(len(embeddings), sample, replace=False)
+            embeddings = embeddings[rows]
+        if dims > min(embeddings.shape):
+            raise ValueError(f"Cannot fit {dims} components on {embeddings.shape[0]} x {embeddings.shape[1]} embeddings.")
+
+        mean = embeddings.mean(axis=0)
+        _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+        return cls(mean, vt[:dims])
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        return (np.asarray(embeddings, dtype=np.float32) - self.mean) @ self.components.T
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npz")
+        with os.fdopen(fd, "wb") as handle:
+            np.savez(handle, mean=self.mean, components=self.components)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
+
+
+def project_queries(queries: np.ndarray, projection: pca_projection | None = None) -> tuple:
+    """Full-size float32 queries -> (queries in stored space, per-query offset)."""
+    queries = np.asarray(queries, dtype=np.float32)
+    if projection is None:
+        return queries, np.zeros(len(queries), dtype=np.float32)
+    return queries @ projection.components.T, queries @ projection.mean
+
+
+class compact_embeddings:
+    def __init__(self, codes: np.ndarray, scales: np.ndarray | None = None, projection: pca_projection | None = None):
+        self.codes = codes
+        self.scales = scales
+        self.projection = projection
+
+    @property
+    def storage(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def compress(cls, embeddings: np.ndarray, storage: str = "float16", projection: pca_projection | None = None):
+        if storage not in STORAGE_FORMATS:
+            raise ValueError(f"Unknown embedding storage '{storage}', expected one of {STORAGE_FORMATS}.")
+
+        vectors = projection.project(embeddings) if projection is not None else np.asarray(embeddings, dtype=np.float32)
+        if storage != "int8":
+            return cls(vectors.astype(storage), None, projection)
+
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return cls(codes, scales.astype(np.float32), projection)
+
+    def vectors(self) -> np.ndarray:
+        """Decoded rows in the stored (possibly projected) space, float32."""
+        vectors = self.codes.astype(np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[:, None]
+        return vectors
+
+    def similarity(self, queries: np.ndarray) -> np.ndarray:
+        """queries x rows dot products, approximating cosine for unit-norm inputs."""
+        projected, offsets = project_queries(queries, self.projection)
+        similarity = projected @ self.codes.T.astype(np.float32, copy=False)
+        if self.scales is not None:
+            similarity *= self.scales
+        return similarity + offsets[:, None]
+
+    def to_bytes(self) -> tuple:
+        return self.codes.tobytes(), (self.scales.tobytes() if self.scales is not None else None)
+
+    @classmethod
+    def from_bytes(cls, storage: str, dim: int, codes: bytes, scales: bytes | None = None, projection: pca_projection | None = None):
+        codes = np.frombuffer(codes, dtype=storage).reshape(-1, dim)
+        scales = np.frombuffer(scales, dtype=np.float32) if scales else None
+        return cls(codes, scales, projection)
+
+
+def main(argv=None):
+    from coreengine.engine import semantic_engine
+
+    parser = argparse.ArgumentParser(description="Fit a PCA projection on the cached chunk embeddings.")
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--output", default=None, help="Default: EMBEDDING_PCA_PATH or the cache directory.")
+    args = parser.parse_args(argv)
+
+    embeddings = semantic_engine.cache().disk_vectors()
+    if not len(embeddings):
+        raise SystemExit("The embedding cache is empty; run `manage.py embedding_cache warm` first.")
+
+    projection = pca_projection.fit(embeddings, args.dims)
+    output = args.output or semantic_engine.projection_path()
+    path = projection.save(output)
+
+    centered = np.asarray(embeddings[:50000], dtype=np.float32) - projection.mean
+    explained = float(np.sum((centered @ projection.components.T) ** 2) / np.sum(centered ** 2))
+    print(f"Fitted {projection.version} on {len(embeddings)} embeddings "
+          f"({explained:.1%} of variance kept), wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+import gc
+import os
+import threading
+import time
+
+# How often get()/acquire() look for idle models to evict.
+SWEEP_INTERVAL = 30.0
+
+
+def _rss_bytes():
+    # Current (not peak) resident set size; only available on Linux.
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _configured_idle_timeouts()->dict:
+    # MODEL_IDLE_TIMEOUTS="spacy:chunks=600,sentence_encoder=1800"
+    timeouts = {}
+    for item in os.getenv("MODEL_IDLE_TIMEOUTS", "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+class model_registry:
+    """Process-wide home for heavy models.
+
+    Modules register a loader under a name at import time; nothing is loaded
+    until `get`/`acquire` (or `warmup`) asks for it, so importing the core
+    engine stays cheap for manage.py commands and tests.
+
+    Each model loads at most once at a time behind its own lock. Models with
+    an idle timeout are dropped after going unused that long, but never
+    while a caller holds them through `acquire`.
+    """
+    _loaders = {}
+    _idle_timeouts = {}
+    _models = {}
+    _locks = {}
+    _refs = {}
+    _last_used = {}
+    _load_seconds = {}
+    _resident_bytes = {}
+    _load_count = {}
+    _lock = threading.Lock()
+    _last_sweep = 0.0
+
+    @classmethod
+    def register(cls, name: str, loader, idle_timeout: float | None = None) -> None:
+        if idle_timeout is None:
+            idle_timeout = _configured_idle_timeouts().get(name)
+        with cls._lock:
+            cls._loaders[name] = loader
+            cls._idle_timeouts[name] = idle_timeout
+            cls._locks.setdefault(name, threading.Lock())
+            cls._refs.setdefault(name, 0)
+
+    @classmethod
+    def _load(cls, name: str):
+        if name not in cls._loaders:
+            raise KeyError(f"No model registered under '{name}'.")
+
+        with cls._locks[name]:
+            model = cls._models.get(name)
+            if model is None:
+                rss_before = _rss_bytes()
+                start = time.perf_counter()
+                model = cls._loaders[name]()
+                cls._load_seconds[name] = round(time.perf_counter() - start, 3)
+                rss_after = _rss_bytes()
+                cls._resident_bytes[name] = (
+                    max(rss_after - rss_before, 0)
+                    if rss_before is not None and rss_after is not None else None
+                )
+                cls._load_count[name] = cls._load_count.get(name, 0) + 1
+                cls._models[name] = model
+        return model
+
+    @classmethod
+    def get(cls, name: str):
+        cls._maybe_sweep()
+        model = cls._models.get(name)
+        if model is None:
+            model = cls._load(name)
+        cls._last_used[name] = time.monotonic()
+        return model
+
+    @classmethod
+    @contextmanager
+    def acquire(cls, name: str):
+        """Like get(), but keeps the model pinned against idle eviction."""
+        cls._maybe_sweep()
+        with cls._lock:
+            cls._refs[name] = cls._refs.get(name, 0) + 1
+        try:
+            model = cls._models.get(name)
+            if model is None:
+                model = cls._load(name)
+            cls._last_used[name] = time.monotonic()
+            yield model
+        finally:
+            with cls._lock:
+                cls._refs[name] -= 1
+            cls._last_used[name] = time.monotonic()
+
+    @classmethod
+    def is_loaded(cls, name: str) -> bool:
+        return name in cls._models
+
+    @classmethod
+    def warmup(cls, names=None) -> list[str]:
+        names = list(cls._loaders) if names is None else list(names)
+        for name in names:
+            cls.get(name)
+        return names
+
+    @classmethod
+    def evict(cls, name: str) -> bool:
+        lock = cls._locks.get(name)
+        if lock is None:
+            return False
+        with lock:
+            with cls._lock:
+                if name not in cls._models or cls._refs.get(name, 0) > 0:
+                    return False
+                del cls._models[name]
+        gc.collect()
+        return True
+
+    @classmethod
+    def evict_idle(cls) -> list[str]:
+        now = time.monotonic()
+        evicted = []
+        for name, timeout in list(cls._idle_timeouts.items()):
+            if not timeout or name not in cls._models:
+                continue
+            if now - cls._last_used.get(name, now) >= timeout and cls.evict(name):
+                evicted.append(name)
+        return evicted
+
+    @classmethod
+    def _maybe_sweep(cls):
+        now = time.monotonic()
+        if now - cls._last_sweep < SWEEP_INTERVAL:
+            return
+        cls._last_sweep = now
+        cls.evict_idle()
+
+    @classmethod
+    def status(cls) -> dict:
+        now = time.monotonic()
+        return {
+            name: {
+                "loaded": name in cls._models,
+                "load_seconds": cls._load_seconds.get(name),
+                "rss_bytes": cls._resident_bytes.get(name) if name in cls._models else None,
+                "load_count": cls._load_count.get(name, 0),
+                "refs": cls._refs.get(name, 0),
+                "idle_seconds": round(now - cls._last_used[name], 1) if name in cls._last_used else None,
+                "idle_timeout": cls._idle_timeouts.get(name),
+            }
+            for name in cls._loaders
+        }
@@ -0,0 +1,116 @@
+"""Layered cache of analysis results on Django's cache framework.
+
+Each layer is keyed by what its stage depends on:
+
+  text      extracted text      file content hash, extension, PDF caps
+  analysis  sections/skills     text hash, taxonomy version, skill matching mode
+  semantic  semantic score      text hash, JD hash, encoder model, chunking
+
+so re-uploading a file skips extraction and parsing, and changing only the
+JD or the AI toggle costs JD parsing plus a similarity computation.
+
+Entries live in the Django cache named by RESULT_CACHE_ALIAS ("results"),
+which also sets TTL and size limits. Outside Django, or when that alias is
+not configured, every lookup misses and nothing is stored. Cache errors are
+logged and treated as misses; they never fail an analysis.
+"""
+import hashlib
+import logging
+import os
+
+from coreengine import metrics
+
+logger=logging.getLogger(__name__)
+
+_MISSING=object()
+
+
+def digest(data)->str:
+    if isinstance(data,str):
+        data=data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _backend():
+    alias=os.getenv("RESULT_CACHE_ALIAS","results")
+    if not alias:
+        return None
+    try:
+        from django.conf import settings
+        from django.core.cache import caches
+    except ImportError:
+        return None
+    if not settings.configured or alias not in settings.CACHES:
+        return None
+    return caches[alias]
+
+
+def enabled()->bool:
+    return _backend() is not None
+
+
+def make_key(layer:str,parts)->str:
+    return ":".join([layer,*(str(part) for part in parts)])
+
+
+def lookup(layer:str,parts):
+    """Cached value or None."""
+    return get_many(layer,[parts])[0]
+
+
+def store(layer:str,parts,value):
+    set_many(layer,[(parts,value)])
+
+
+def get_many(layer:str,parts_list:list)->list:
+    """Cached values in parts_list order, None for misses."""
+    backend=_backend()
+    if backend is None or not parts_list:
+        return [None]*len(parts_list)
+    keys=[make_key(layer,parts) for parts in parts_list]
+    try:
+        found=backend.get_many(keys)
+    except Exception:
+        logger.warning("Result cache read failed (%s).",layer,exc_info=True)
+        return [None]*len(parts_list)
+    hits=sum(key in found for key in keys)
+    if hits:
+        metrics.inc(metrics.CACHE_REQUESTS,hits,layer=layer,result="hit")
+    if hits<len(keys):
+        metrics.inc(metrics.CACHE_REQUESTS,len(keys)-hits,layer=layer,result="miss")
+    return [found.get(key) for key in keys]
+
+
+def set_many(layer:str,items:list):
+    """Store (parts, value) pairs."""
+    backend=_backend()
+    if backend is None or not items:
+        return
+    try:
+        backend.set_many({make_key(layer,parts): value for parts,value in items})
+    except Exception:
+        logger.warning("Result cache write failed (%s).",layer,exc_info=True)
+
+
+def cached(layer:str,parts,compute):
+    """compute() through the cache; exceptions from compute are not cached."""
+    backend=_backend()
+    if backend is None:
+        return compute()
+
+    key=make_key(layer,parts)
+    try:
+        value=backend.get(key,_MISSING)
+    except Exception:
+        logger.warning("Result cache read failed (%s).",layer,exc_info=True)
+        value=_MISSING
+    metrics.inc(metrics.CACHE_REQUESTS,layer=layer,result="miss" if value is _MISSING else "hit")
+    if value is not _MISSING:
+        return value
+
+    value=compute()
+    try:
+        backend.set(key,value)
+    except Exception:
+        logger.warning("Result cache write failed (%s).",layer,exc_info=True)
+    return value
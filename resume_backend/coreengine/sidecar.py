@@ -0,0 +1,212 @@
+"""Local inference sidecar: one process owns the encoder, web workers connect.
+
+    python -m coreengine.sidecar --socket /run/resume/encoder.sock
+
+Workers opt in with ENCODER_SOCKET=<path>. If the socket is missing or the
+sidecar stops answering they fall back to loading the encoder in-process.
+
+Wire format (network byte order) over a Unix stream socket, one request per
+round trip on a persistent connection:
+
+    request:  b"ENC1" | u32 count | count * (u32 length | utf-8 bytes)
+    response: u8 status | u32 rows | u32 dim | rows*dim float32 (little-endian)
+              status 1 carries a utf-8 error message of `rows` bytes instead
+"""
+import argparse
+import gc
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"ENC1"
+REQUEST_HEADER = struct.Struct("!4sI")
+LENGTH = struct.Struct("!I")
+RESPONSE_HEADER = struct.Struct("!BII")
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class sidecarerror(Exception):
+    pass
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Sidecar connection closed.")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def pack_request(texts: list[str]) -> bytes:
+    parts = [REQUEST_HEADER.pack(MAGIC, len(texts))]
+    for text in texts:
+        encoded = text.encode("utf-8")
+        parts.append(LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def read_request(sock) -> list[str]:
+    magic, count = REQUEST_HEADER.unpack(_recv_exact(sock, REQUEST_HEADER.size))
+    if magic != MAGIC:
+        raise sidecarerror("Bad request header.")
+    texts = []
+    for _ in range(count):
+        (length,) = LENGTH.unpack(_recv_exact(sock, LENGTH.size))
+        texts.append(_recv_exact(sock, length).decode("utf-8"))
+    return texts
+
+
+def pack_response(embeddings: np.ndarray) -> bytes:
+    embeddings = np.ascontiguousarray(embeddings, dtype="<f4")
+    rows, dim = embeddings.shape
+    return RESPONSE_HEADER.pack(STATUS_OK, rows, dim) + embeddings.tobytes()
+
+
+def pack_error(message: str) -> bytes:
+    encoded = message.encode("utf-8")
+    return RESPONSE_HEADER.pack(STATUS_ERROR, len(encoded), 0) + encoded
+
+
+def read_response(sock) -> np.ndarray:
+    status, rows, dim = RESPONSE_HEADER.unpack(_recv_exact(sock, RESPONSE_HEADER.size))
+    if status != STATUS_OK:
+        raise sidecarerror(_recv_exact(sock, rows).decode("utf-8", "replace"))
+    payload = _recv_exact(sock, rows * dim * 4)
+    return np.frombuffer(payload, dtype="<f4").reshape(rows, dim).astype(np.float32)
+
+
+class sidecar_handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                texts = read_request(self.request)
+            except (ConnectionError, sidecarerror, OSError):
+                return
+
+            try:
+                response = pack_response(self.server.encode(texts))
+            except Exception as e:
+                response = pack_error(str(e) or type(e).__name__)
+            self.request.sendall(response)
+
+
+class sidecar_server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, encode):
+        if os.path.exists(path):
+            os.remove(path)  # stale socket from a previous run
+        self.encode = encode
+        super().__init__(path, sidecar_handler)
+        os.chmod(path, 0o660)
+
+
+class sidecar_encoder:
+    """Encoder that forwards to the sidecar, with an in-process fallback.
+
+    The fallback encoder is only built if the sidecar cannot be reached,
+    and the sidecar is retried every `retry_after` seconds after that. It is
+    dropped again once the sidecar answers, so a brief outage does not leave
+    a full model in every worker.
+    """
+    name = "sidecar"
+
+    def __init__(self, path: str, fallback_factory, timeout: float = 30.0, retry_after: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._fallback_factory = fallback_factory
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+        self._down_until = 0.0
+        self._local = threading.local()
+
+    def _connection(self):
+        # Keyed by pid so a socket opened before a fork is never shared.
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.pid = pid
+            self._local.sock = None
+        if self._local.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return self._local.sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def _fallback_encoder(self):
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    self._fallback = self._fallback_factory()
+        return self._fallback
+
+    def _release_fallback(self):
+        # Callers still encoding with it keep their own reference.
+        with self._fallback_lock:
+            self._fallback = None
+        gc.collect()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        if time.monotonic() >= self._down_until:
+            try:
+                sock = self._connection()
+                sock.sendall(pack_request(texts))
+                vectors = read_response(sock)
+            except (OSError, ConnectionError):
+                self._disconnect()
+                self._down_until = time.monotonic() + self.retry_after
+            else:
+                if self._fallback is not None:
+                    self._release_fallback()
+                return vectors
+        return self._fallback_encoder().encode(texts)
+
+
+def serve(path: str, backend: str | None = None, model_name: str | None = None):
+    from coreengine.batcher import micro_batcher
+    from coreengine.encoders import create_encoder
+    from coreengine.engine import semantic_engine
+
+    encoder = create_encoder(backend or semantic_engine.backend(), model_name or semantic_engine.MODEL_NAME)
+    # Every web worker's requests meet here, so batching is always worth it.
+    batcher = micro_batcher(
+        encoder.encode,
+        max_batch=int(os.getenv("ENCODER_MAX_BATCH", "64")),
+        max_wait=float(os.getenv("ENCODER_MAX_WAIT_MS", "5")) / 1000,
+    )
+    with sidecar_server(path, batcher.encode) as server:
+        print(f"Encoder sidecar listening on {path}")
+        server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sentence embeddings over a Unix socket.")
+    parser.add_argument("--socket", default=os.getenv("ENCODER_SOCKET"), required=not os.getenv("ENCODER_SOCKET"))
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args(argv)
+    serve(args.socket, args.backend, args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Single-flight execution: identical concurrent calls share one result.
+
+In a process, calls with a key already in flight wait on the first call's
+future. Across processes on one host, the first call holds an flock on
+<directory>/<key>.lock. A call that finds the lock taken leaves a
+<key>.<id>.wait marker; only then does the holder write its result, as
+JSON, to <key>.result, which the waiters pick up once they get the lock
+instead of computing again. The last waiter to read the result deletes
+it. Calls that arrive after a result was written compute afresh, so
+nothing is reused beyond the overlap. Without fcntl (Windows) only calls
+in the same process coalesce.
+
+Values shared across processes must be JSON-serializable (tuples come
+back as lists); if one is not, the waiters compute for themselves.
+"""
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process locking
+    fcntl = None
+
+logger=logging.getLogger(__name__)
+
+_MISSING=object()
+
+
+def coalesce_dir()->Path:
+    return Path(os.getenv("COALESCE_DIR") or Path.home()/".cache"/"resume_backend"/"inflight")
+
+
+class single_flight:
+    SWEEP_INTERVAL=60.0
+
+    def __init__(self,directory:Path | None,timeout:float=120.0):
+        self.directory=Path(directory) if directory is not None else None
+        self.timeout=timeout
+
+        self.coalesced=0
+
+        self._inflight={}
+        self._lock=threading.Lock()
+        self._last_sweep=0.0
+
+    def do(self,key:str,compute)->tuple:
+        """(value, shared): shared is True when another call computed value.
+
+        Exceptions from compute reach every caller waiting on it and are
+        never shared across processes.
+        """
+        arrived=time.time()
+        with self._lock:
+            future=self._inflight.get(key)
+            leader=future is None
+            if leader:
+                future=self._inflight[key]=Future()
+
+        if not leader:
+            try:
+                value=future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                logger.warning("Gave up waiting for in-flight %s after %ss.",key,self.timeout)
+                return compute(),False
+            with self._lock:
+                self.coalesced+=1
+            return value,True
+
+        try:
+            value,shared=self._across_processes(key,compute,arrived)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            self.coalesced+=shared
+        future.set_result(value)
+        return value,shared
+
+    # ---------------------------
+    # CROSS-PROCESS
+    # ---------------------------
+
+    def _across_processes(self,key:str,compute,arrived:float)->tuple:
+        if fcntl is None or self.directory is None:
+            return compute(),False
+        try:
+            self.directory.mkdir(mode=0o700,parents=True,exist_ok=True)
+            handle=open(self.directory/f"{key}.lock","a+b")
+        except OSError:
+            logger.warning("Request coalescing directory %s is not usable.",self.directory,exc_info=True)
+            return compute(),False
+
+        with handle:
+            marker=None
+            locked=False
+            try:
+                locked,marker=self._acquire(key,handle)
+                if marker is not None:
+                    value=self._load(key,arrived)
+                    # Done waiting either way; the last waiter cleans up.
+                    self._unlink(marker)
+                    marker=None
+                    if locked and not self._waiters(key):
+                        self._unlink(self.directory/f"{key}.result")
+                    if value is not _MISSING:
+                        return value,True
+                value=compute()
+                # Only write the result when another process is waiting for it.
+                if self._waiters(key):
+                    self._store(key,value)
+                return value,False
+            finally:
+                if marker is not None:
+                    self._unlink(marker)
+                if locked:
+                    fcntl.flock(handle,fcntl.LOCK_UN)
+                self._sweep()
+
+    def _acquire(self,key:str,handle)->tuple:
+        """(locked, wait marker); the marker is None if the lock was free."""
+        deadline=time.monotonic()+self.timeout
+        marker=None
+        while True:
+            try:
+                fcntl.flock(handle,fcntl.LOCK_EX|fcntl.LOCK_NB)
+                return True,marker
+            except BlockingIOError:
+                if marker is None:
+                    marker=self.directory/f"{key}.{uuid.uuid4().hex}.wait"
+                    try:
+                        marker.touch()
+                    except OSError:
+                        logger.warning("Could not mark %s as waiting.",key,exc_info=True)
+                if time.monotonic()>=deadline:
+                    logger.warning("Gave up waiting for %s after %ss.",handle.name,self.timeout)
+                    return False,marker
+                time.sleep(0.05)
+
+    def _waiters(self,key:str)->bool:
+        return any(self.directory.glob(f"{key}.*.wait"))
+
+    @staticmethod
+    def _unlink(path:Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _load(self,key:str,arrived:float):
+        # Only a result written after this call arrived was computed for
+        # it; an older one belongs to an earlier, separate request.
+        path=self.directory/f"{key}.result"
+        try:
+            if path.stat().st_mtime<arrived:
+                return _MISSING
+            with open(path,encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError,ValueError):
+            return _MISSING
+
+    def _store(self,key:str,value):
+        tmp_path=None
+        try:
+            payload=json.dumps(value)
+            fd,tmp_path=tempfile.mkstemp(dir=self.directory,suffix=".tmp")
+            with os.fdopen(fd,"w",encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_path,self.directory/f"{key}.result")
+        except Exception:
+            logger.warning("Could not share result for %s.",key,exc_info=True)
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _sweep(self):
+        # Drop files nobody can still be waiting for. A lock file is only
+        # removed while held; a process that opened it just before that
+        # may then compute once more on its own, which is harmless.
+        now=time.time()
+        if now-self._last_sweep<self.SWEEP_INTERVAL:
+            return
+        self._last_sweep=now
+        try:
+            paths=list(self.directory.iterdir())
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if now-path.stat().st_mtime<2*self.timeout:
+                    continue
+                if path.suffix!=".lock":
+                    path.unlink()
+                    continue
+                with open(path,"a+b") as handle:
+                    fcntl.flock(handle,fcntl.LOCK_EX|fcntl.LOCK_NB)
+                    path.unlink()
+            except OSError:
+                continue
+
+
+_single_flight=None
+_lock=threading.Lock()
+
+
+def get_single_flight()->single_flight:
+    global _single_flight
+    if _single_flight is None:
+        with _lock:
+            if _single_flight is None:
+                _single_flight=single_flight(
+                    coalesce_dir(),
+                    timeout=float(os.getenv("COALESCE_TIMEOUT","120")),
+                )
+    return _single_flight
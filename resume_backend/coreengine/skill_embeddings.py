@@ -0,0 +1,93 @@
+"""Map out-of-taxonomy phrases ("k8s cluster ops") to canonical skills.
+
+Every phrase the taxonomy knows (canonical names and variants) is embedded
+once per taxonomy version and persisted next to the other precomputed
+embeddings. Unmatched phrases are embedded in one batch and assigned to the
+skill of their nearest taxonomy phrase when the cosine similarity clears
+SKILL_SIMILARITY_THRESHOLD. Results are cached per phrase, including misses,
+in this module's own LRU: phrases never go through the chunk embedding
+cache, where they would push out resume and JD chunks and end up in the
+vectors the PCA projection is fitted on.
+"""
+from collections import OrderedDict
+import os
+import threading
+
+import numpy as np
+
+from coreengine.engine import semantic_engine
+
+
+def embedding_match_enabled()->bool:
+    return os.getenv("SKILL_EMBEDDING_MATCH","False").lower() in ("1","true","yes","on")
+
+
+def _usable(phrase:str)->bool:
+    return len(phrase)>=3 and any(char.isalpha() for char in phrase)
+
+
+class skill_normalizer:
+    def __init__(self,matcher,threshold:float=0.65,cache_items:int=20000):
+        self.version=matcher.version
+        self.threshold=threshold
+        self.cache_items=cache_items
+        self.phrases=sorted(matcher.phrases)
+        self.phrase_skills=[tuple(matcher.phrases[phrase]) for phrase in self.phrases]
+        self.embeddings=semantic_engine.precomputed_embeddings(self.phrases)
+        self._cache=OrderedDict()
+        self._lock=threading.Lock()
+
+    def nearest(self,phrases:list[str])->dict:
+        """phrase -> tuple of skill ids (empty when nothing is close enough)."""
+        result={}
+        with self._lock:
+            for phrase in phrases:
+                if phrase in self._cache:
+                    self._cache.move_to_end(phrase)
+                    result[phrase]=self._cache[phrase]
+        missing=list(dict.fromkeys(phrase for phrase in phrases if phrase not in result))
+        if not missing:
+            return result
+
+        similarity=semantic_engine._cosine_matrix(semantic_engine._encode_uncached(missing),self.embeddings)
+        best=np.argmax(similarity,axis=1)
+        best_scores=similarity[np.arange(len(missing)),best]
+
+        with self._lock:
+            for phrase,row,score in zip(missing,best,best_scores):
+                skills=self.phrase_skills[row] if score>=self.threshold else ()
+                result[phrase]=skills
+                self._cache[phrase]=skills
+            while len(self._cache)>self.cache_items:
+                self._cache.popitem(last=False)
+        return result
+
+    def skill_counts(self,phrases)->dict:
+        candidates=sorted({phrase for phrase in phrases if _usable(phrase)})
+        if not candidates:
+            return {}
+        skill_counts={}
+        for skills in self.nearest(candidates).values():
+            for skill_id in skills:
+                skill_counts[skill_id]=1
+        return skill_counts
+
+
+_normalizer=None
+_lock=threading.Lock()
+
+
+def get_skill_normalizer(matcher)->skill_normalizer:
+    # One normalizer per taxonomy version; a reload builds a fresh one.
+    global _normalizer
+    normalizer=_normalizer
+    if normalizer is not None and normalizer.version==matcher.version:
+        return normalizer
+    with _lock:
+        if _normalizer is None or _normalizer.version!=matcher.version:
+            _normalizer=skill_normalizer(
+                matcher,
+                threshold=float(os.getenv("SKILL_SIMILARITY_THRESHOLD","0.65")),
+                cache_items=int(os.getenv("SKILL_PHRASE_CACHE_ITEMS","20000")),
+            )
+        return _normalizer
@@ -0,0 +1,137 @@
+from coreengine.taxonomy import load_taxonomy,artifact_path
+import os
+import threading
+import time
+
+# How often a running process looks at the taxonomy artifact for a new version.
+RELOAD_INTERVAL = 5.0
+
+
+class skill_matcher:
+    """Token trie over every normalized variant of a compiled taxonomy.
+
+    `match` scans the normalized text a single time and returns the same
+    {category: {skill: count}} shape as the per-variant regex scan it
+    replaces.
+    """
+
+    def __init__(self,taxonomy:dict,stamp=None):
+        self.version=taxonomy["version"]
+        self.stamp=stamp
+        self.skills=[(category,canonical) for category,canonical,_ in taxonomy["skills"]]
+        self.skill_variants=[variants for _,_,variants in taxonomy["skills"]]
+        self.variant_skills=taxonomy["variant_skills"]
+        self.collapsed=taxonomy["collapsed"]
+        self.phrases=taxonomy["phrases"]
+        self._trie={}
+
+        for variant_id,variant in enumerate(taxonomy["variants"]):
+            node=self._trie
+            for token in variant.split():
+                node=node.setdefault(token,{})
+            # Tokens are never empty, so None is free to mark a terminal node.
+            node[None]=variant_id
+
+    def count_variants(self,tokens:list[str])->dict:
+        # Non-overlapping, leftmost-first occurrences per variant, matching
+        # what re.findall(r"\bvariant\b", text) reports on normalized text.
+        counts={}
+        next_free={}
+        root=self._trie
+        total=len(tokens)
+
+        for start in range(total):
+            node=root.get(tokens[start])
+            end=start+1
+            while node is not None:
+                variant_id=node.get(None)
+                if variant_id is not None and start>=next_free.get(variant_id,0):
+                    counts[variant_id]=counts.get(variant_id,0)+1
+                    next_free[variant_id]=end
+                if end>=total:
+                    break
+                node=node.get(tokens[end])
+                end+=1
+        return counts
+
+    def skill_counts(self,tokens:list[str])->dict:
+        variant_counts=self.count_variants(tokens)
+        result={}
+
+        for variant_id in variant_counts:
+            for skill_id in self.variant_skills[variant_id]:
+                if skill_id in result:
+                    continue
+                # The first variant (in SKILL_MAP order) that occurs decides
+                # the count, exactly like the original early `break`.
+                for candidate in self.skill_variants[skill_id]:
+                    if candidate in variant_counts:
+                        result[skill_id]=variant_counts[candidate]
+                        break
+
+        for token in set(tokens):
+            for skill_id in self.collapsed.get(token,()):
+                if skill_id not in result:
+                    result[skill_id]=1
+        return result
+
+    def group(self,skill_counts:dict)->dict:
+        detected_skill={}
+        for skill_id in sorted(skill_counts):
+            category,canonical=self.skills[skill_id]
+            detected_skill.setdefault(category,{})[canonical]=skill_counts[skill_id]
+        return detected_skill
+
+    def match(self,soft_text:str)->dict:
+        return self.group(self.skill_counts(soft_text.split()))
+
+    def match_phrases(self,phrases)->dict:
+        # Exact lookup of already-normalized phrases (see normalize_phrase);
+        # every hit counts once, like the original fallback loop.
+        skill_counts={}
+        for phrase in phrases:
+            for skill_id in self.phrases.get(phrase,()):
+                skill_counts[skill_id]=1
+        return self.group(skill_counts)
+
+
+_matcher=None
+_checked_at=0.0
+_lock=threading.Lock()
+
+
+def _artifact_stamp():
+    try:
+        stat=os.stat(artifact_path())
+    except OSError:
+        return None
+    return (stat.st_mtime_ns,stat.st_size)
+
+
+def reload_skill_matcher()->skill_matcher:
+    """Build a matcher for the current artifact and swap it in.
+
+    Requests already holding the previous matcher finish on it; the swap
+    itself is a single reference assignment.
+    """
+    global _matcher,_checked_at
+    with _lock:
+        stamp=_artifact_stamp()
+        matcher=skill_matcher(load_taxonomy(),stamp)
+        _matcher=matcher
+        _checked_at=time.monotonic()
+    return matcher
+
+
+def get_skill_matcher()->skill_matcher:
+    global _checked_at
+    matcher=_matcher
+    if matcher is None:
+        return reload_skill_matcher()
+
+    now=time.monotonic()
+    if now-_checked_at>=RELOAD_INTERVAL:
+        _checked_at=now
+        if _artifact_stamp()!=matcher.stamp:
+            return reload_skill_matcher()
+    return matcher
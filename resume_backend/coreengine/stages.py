@@ -0,0 +1,96 @@
+"""A small dependency graph of pipeline stages, run on a bounded thread pool.
+
+Stages name the values they need; a stage starts as soon as those exist.
+Heavy stages (spaCy, the encoder, regex scans over the whole text) go to
+the pool, where they overlap wherever the work releases the GIL. Cheap
+stages marked inline run on the calling thread between waits, so they do
+not pay for a hand-off. Every stage is timed under metrics.STAGE_SECONDS.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextvars
+import os
+import threading
+
+from coreengine import metrics
+
+
+def _timed(name:str,function):
+    def run(*args):
+        with metrics.timer(metrics.STAGE_SECONDS,stage=name):
+            return function(*args)
+    return run
+
+
+class stage_graph:
+    def __init__(self):
+        self._stages={}
+
+    def add(self,name:str,function,*needs:str,inline:bool=False):
+        """function(*values of needs) -> value of name."""
+        if name in self._stages:
+            raise ValueError(f"Stage already defined: {name}")
+        self._stages[name]=(_timed(name,function),needs,inline)
+        return self
+
+    def __contains__(self,name:str)->bool:
+        return name in self._stages
+
+    def run(self,values:dict,executor:ThreadPoolExecutor | None=None)->dict:
+        """Run every stage not already in values; returns all values.
+
+        Without an executor the stages run serially, in dependency order.
+        The first stage to fail cancels what has not started and re-raises.
+        """
+        values=dict(values)
+        pending={name for name in self._stages if name not in values}
+        running={}
+        try:
+            while pending or running:
+                ready=[
+                    name for name in self._stages
+                    if name in pending and all(need in values for need in self._stages[name][1])
+                ]
+                # Hand pool work out first so it overlaps the inline stages.
+                for name in sorted(ready,key=lambda name: self._stages[name][2]):
+                    pending.discard(name)
+                    function,needs,inline=self._stages[name]
+                    args=[values[need] for need in needs]
+                    if inline or executor is None:
+                        values[name]=function(*args)
+                    else:
+                        # The caller's context (e.g. request timings) follows the stage.
+                        running[executor.submit(contextvars.copy_context().run,function,*args)]=name
+
+                if ready:
+                    continue
+                if not running:
+                    missing=sorted(need for name in pending for need in self._stages[name][1] if need not in values and need not in self._stages)
+                    raise ValueError(f"Stages cannot run, missing inputs: {missing or sorted(pending)}")
+
+                done,_=wait(running,return_when=FIRST_COMPLETED)
+                for future in done:
+                    values[running.pop(future)]=future.result()
+        finally:
+            for future in running:
+                future.cancel()
+        return values
+
+
+_pool=None
+_pool_pid=None
+_lock=threading.Lock()
+
+
+def stage_pool()->ThreadPoolExecutor | None:
+    """Process-wide pool of STAGE_WORKERS threads (default 4; 0 = serial)."""
+    global _pool,_pool_pid
+    workers=int(os.getenv("STAGE_WORKERS","4"))
+    if workers<=0:
+        return None
+    # Per process: a forked web worker does not inherit the pool's threads.
+    if _pool is None or _pool_pid!=os.getpid():
+        with _lock:
+            if _pool is None or _pool_pid!=os.getpid():
+                _pool=ThreadPoolExecutor(max_workers=workers,thread_name_prefix="stage")
+                _pool_pid=os.getpid()
+    return _pool
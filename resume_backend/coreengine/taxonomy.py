@@ -0,0 +1,179 @@
+"""Compiled, versioned form of SKILL_MAP.
+
+`compile_taxonomy` does all variant normalization up front and produces a
+plain dict with integer skill and variant ids. It is written to disk as a
+single JSON artifact so workers load it with one read instead of
+re-normalizing the taxonomy.
+
+Rebuild after editing skill_db.py:
+
+    python -m coreengine.taxonomy [--output PATH]
+"""
+from coreengine.skill_db import SKILL_MAP
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+ARTIFACT_FORMAT = 2
+DEFAULT_ARTIFACT_PATH = Path(__file__).resolve().parent / "data" / "skill_taxonomy.json"
+
+# Collapsed variants this short ("js", "sql") are too ambiguous to match
+# against single glued-together tokens.
+MIN_COLLAPSED_LENGTH = 4
+
+
+class taxonomyerror(Exception):
+    pass
+
+
+def normalize_text(text:str)->str:
+    text = text.lower()
+    text = re.sub(r"[./_-]", " ", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def collapser(text:str)->str:
+    return text.replace(" ", "")
+
+
+def normalize_phrase(text:str)->str:
+    # The lighter normalization fallback_skill_detection applies to spaCy
+    # noun chunks: punctuation other than "-" and "/" is kept.
+    text = text.lower().strip()
+    text = re.sub(r"[-/]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text
+
+
+def taxonomy_version(skill_map:dict)->str:
+    payload = json.dumps([ARTIFACT_FORMAT, skill_map], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_taxonomy(skill_map:dict=SKILL_MAP)->dict:
+    skills = []           # skill id -> [category, canonical, variant ids in SKILL_MAP order]
+    variants = []         # variant id -> normalized variant
+    variant_skills = []   # variant id -> skill ids sharing that variant
+    collapsed = {}        # collapsed variant -> skill ids
+    phrases = {}          # fallback phrase (canonical or variant) -> skill ids
+    variant_ids = {}
+
+    for category, canonical_map in skill_map.items():
+        for canonical, raw_variants in canonical_map.items():
+            skill_id = len(skills)
+            ordered = []
+            phrases.setdefault(canonical.replace("_", " "), []).append(skill_id)
+
+            for variant in raw_variants:
+                owners = phrases.setdefault(normalize_phrase(variant), [])
+                if skill_id not in owners:
+                    owners.append(skill_id)
+
+                soft_variant = normalize_text(variant)
+                if not soft_variant:
+                    continue
+
+                variant_id = variant_ids.get(soft_variant)
+                if variant_id is None:
+                    variant_id = len(variants)
+                    variant_ids[soft_variant] = variant_id
+                    variants.append(soft_variant)
+                    variant_skills.append([])
+                if variant_id not in ordered:
+                    ordered.append(variant_id)
+                    variant_skills[variant_id].append(skill_id)
+
+                hard_variant = collapser(soft_variant)
+                if len(hard_variant) >= MIN_COLLAPSED_LENGTH:
+                    owners = collapsed.setdefault(hard_variant, [])
+                    if skill_id not in owners:
+                        owners.append(skill_id)
+
+            skills.append([category, canonical, ordered])
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": taxonomy_version(skill_map),
+        "skills": skills,
+        "variants": variants,
+        "variant_skills": variant_skills,
+        "collapsed": collapsed,
+        "phrases": phrases,
+    }
+
+
+def write_taxonomy(taxonomy:dict, path:Path=DEFAULT_ARTIFACT_PATH)->Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write next to the target and rename over it so a reloading worker
+    # never observes a half-written artifact.
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".taxonomy-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(taxonomy, handle, separators=(",", ":"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_taxonomy(path:Path)->dict:
+    try:
+        taxonomy = json.loads(Path(path).read_bytes())
+    except (OSError, ValueError) as e:
+        raise taxonomyerror(f"Unable to read taxonomy artifact {path}: {e}") from e
+
+    if taxonomy.get("format") != ARTIFACT_FORMAT:
+        raise taxonomyerror(
+            f"Taxonomy artifact {path} has format {taxonomy.get('format')}, expected {ARTIFACT_FORMAT}."
+        )
+    return taxonomy
+
+
+def artifact_path()->Path:
+    return Path(os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_ARTIFACT_PATH)
+
+
+def load_taxonomy(path:Path | None=None)->dict:
+    """Load the active taxonomy, compiling SKILL_MAP if no usable artifact exists.
+
+    An explicit path or SKILL_TAXONOMY_PATH is trusted as-is, which is how a
+    new taxonomy version is rolled out. The bundled artifact is only used
+    while it still matches skill_db.py.
+    """
+    if path is not None or os.getenv("SKILL_TAXONOMY_PATH"):
+        return read_taxonomy(path or artifact_path())
+
+    try:
+        taxonomy = read_taxonomy(DEFAULT_ARTIFACT_PATH)
+    except taxonomyerror:
+        return compile_taxonomy(SKILL_MAP)
+
+    if taxonomy.get("version") != taxonomy_version(SKILL_MAP):
+        return compile_taxonomy(SKILL_MAP)
+    return taxonomy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile skill_db.SKILL_MAP into a taxonomy artifact.")
+    parser.add_argument("--output", default=str(DEFAULT_ARTIFACT_PATH))
+    args = parser.parse_args(argv)
+
+    taxonomy = compile_taxonomy(SKILL_MAP)
+    path = write_taxonomy(taxonomy, args.output)
+    print(f"Wrote taxonomy {taxonomy['version']} ({len(taxonomy['skills'])} skills, "
+          f"{len(taxonomy['variants'])} variants) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""In-process nearest-resume search over stored chunk embeddings.
+
+Every resume contributes a contiguous run of chunk rows to one matrix, kept
+in the same compact form as the database (float16, or int8 codes with one
+scale per row; see coreengine.quantization), so the index costs what the
+stored rows cost. A query (the JD's chunk embeddings) is scored against all
+resumes with the same max-sim aggregation as
+semantic_engine.compute_semantic_score: for each JD chunk take the best
+matching resume chunk, then average.
+
+Exact search walks the matrix in blocks of whole resumes; only one block at
+a time is decoded to float32, so the temporary matrices stay small. With
+`candidates` set, resumes are first shortlisted by their mean chunk
+embedding (one small matvec) and only the shortlist is scored exactly. That
+is much faster on large indexes but the mean is a loose proxy for max-sim,
+so true top-k resumes can be missed; benchmarks/bench_resume_index.py
+reports the recall.
+"""
+import threading
+
+import numpy as np
+
+from coreengine.quantization import compact_embeddings
+
+
+class vector_index:
+    def __init__(self,dim:int,storage:str="float16",block_rows:int=16384):
+        self.dim=dim
+        self.storage=storage
+        self.block_rows=block_rows
+        self.keys=[]           # slot -> key (None once removed)
+        self._slots={}         # key -> slot
+        self._pending=[]       # (slot, compact_embeddings) added since the last compaction
+        self._codes=np.empty((0,dim),dtype=storage)
+        self._scales=np.empty(0,dtype=np.float32) if storage=="int8" else None
+        self._centroids=None   # slot -> mean chunk, built on the first shortlisted search
+        self._starts=np.empty(0,dtype=np.int64)   # slot -> first row
+        self._lengths=np.empty(0,dtype=np.int64)  # slot -> row count (0 once removed)
+        self._lock=threading.Lock()
+
+    def __len__(self)->int:
+        return len(self._slots)
+
+    def __contains__(self,key)->bool:
+        return key in self._slots
+
+    @property
+    def rows(self)->int:
+        return int(self._lengths.sum())+sum(len(embeddings) for _,embeddings in self._pending)
+
+    @property
+    def nbytes(self)->int:
+        """Bytes held for the chunk rows (codes and scales)."""
+        compacted=self._codes.nbytes+(self._scales.nbytes if self._scales is not None else 0)
+        return compacted+sum(embeddings.nbytes for _,embeddings in self._pending)
+
+    def add(self,key,embeddings):
+        """Insert or replace the chunk embeddings stored under key.
+
+        embeddings is a compact_embeddings block (kept as is when it has the
+        index's storage) or float vectors, which are compressed.
+        """
+        if not isinstance(embeddings,compact_embeddings):
+            embeddings=compact_embeddings.compress(np.asarray(embeddings,dtype=np.float32).reshape(-1,self.dim),self.storage)
+        elif embeddings.storage!=self.storage:
+            embeddings=compact_embeddings.compress(embeddings.vectors(),self.storage)
+        with self._lock:
+            self._discard(key)
+            if not len(embeddings):
+                return
+            slot=len(self.keys)
+            self.keys.append(key)
+            self._slots[key]=slot
+            self._pending.append((slot,embeddings))
+
+    def remove(self,key)->bool:
+        with self._lock:
+            return self._discard(key)
+
+    def _discard(self,key)->bool:
+        slot=self._slots.pop(key,None)
+        if slot is None:
+            return False
+        self.keys[slot]=None
+        if slot<len(self._lengths):
+            self._lengths[slot]=0
+        else:
+            self._pending=[(s,e) for s,e in self._pending if s!=slot]
+        return True
+
+    def _compact(self):
+        # Fold pending additions in, and drop removed rows once they make up
+        # a quarter of the matrix.
+        dead=len(self._codes)-int(self._lengths.sum())
+        if not self._pending and dead*4<=len(self._codes):
+            return
+
+        codes=[]
+        scales=[]
+        keys=[]
+        for slot,key in enumerate(self.keys[:len(self._lengths)]):
+            if key is not None:
+                rows=slice(self._starts[slot],self._starts[slot]+self._lengths[slot])
+                codes.append(self._codes[rows])
+                if self._scales is not None:
+                    scales.append(self._scales[rows])
+                keys.append(key)
+        for slot,embeddings in self._pending:
+            codes.append(embeddings.codes)
+            if self._scales is not None:
+                scales.append(embeddings.scales)
+            keys.append(self.keys[slot])
+
+        lengths=np.array([len(block) for block in codes],dtype=np.int64)
+        self._codes=np.concatenate(codes) if codes else self._codes[:0]
+        if self._scales is not None:
+            self._scales=np.concatenate(scales) if scales else self._scales[:0]
+        self._lengths=lengths
+        self._starts=np.concatenate(([0],np.cumsum(lengths)[:-1])).astype(np.int64) if len(lengths) else lengths
+        self._centroids=None
+        self.keys=keys
+        self._slots={key:slot for slot,key in enumerate(keys)}
+        self._pending=[]
+
+    def _block(self,rows)->compact_embeddings:
+        return compact_embeddings(self._codes[rows],self._scales[rows] if self._scales is not None else None)
+
+    def _centroid_matrix(self)->np.ndarray:
+        if self._centroids is None:
+            centroids=np.zeros((len(self._lengths),self.dim),dtype=np.float32)
+            for slot in np.flatnonzero(self._lengths):
+                start=self._starts[slot]
+                centroids[slot]=self._block(slice(start,start+self._lengths[slot])).vectors().mean(axis=0)
+            self._centroids=centroids
+        return self._centroids
+
+    def _score_slots(self,queries:np.ndarray,slots:np.ndarray)->np.ndarray:
+        """Exact max-sim score for each slot, in slot order."""
+        scores=np.empty(len(slots),dtype=np.float32)
+        decoded=None   # float32 buffer the current block's codes are decoded into
+        position=0
+        while position<len(slots):
+            # Take whole resumes until the block holds about block_rows rows.
+            rows=np.cumsum(self._lengths[slots[position:]])
+            count=max(int(np.searchsorted(rows,self.block_rows,side="right")),1)
+            block=slots[position:position+count]
+
+            lengths=self._lengths[block]
+            offsets=np.cumsum(lengths)-lengths
+            if np.all(block[1:]==block[:-1]+1):
+                start=self._starts[block[0]]
+                rows=slice(start,start+lengths.sum())
+            else:
+                # Row numbers of every chunk in the block, without a Python loop.
+                rows=np.arange(lengths.sum())+np.repeat(self._starts[block]-offsets,lengths)
+
+            # Same product as compact_embeddings.similarity, but rows x jd
+            # chunks so the per-resume max runs over contiguous rows.
+            # NumPy has no fast float16 matmul, so decode first.
+            if self._codes.dtype==np.float32:
+                vectors=self._codes[rows]
+            else:
+                size=int(lengths.sum())
+                if decoded is None or len(decoded)<size:
+                    decoded=np.empty((max(size,self.block_rows),self.dim),dtype=np.float32)
+                vectors=decoded[:size]
+                np.copyto(vectors,self._codes[rows],casting="unsafe")
+            similarity=vectors@queries.T                        # rows x jd chunks
+            if self._scales is not None:
+                similarity*=self._scales[rows][:,None]
+            best=np.maximum.reduceat(similarity,offsets,axis=0)  # resumes x jd chunks
+            scores[position:position+count]=best.mean(axis=1)
+            position+=count
+        return scores
+
+    def search(self,queries:np.ndarray,k:int=10,candidates:int | None=None,offsets:np.ndarray | None=None)->list[tuple]:
+        """Top-k (key, score) pairs, scored on the 0-100 scale of compute_semantic_score.
+
+        `offsets` adds a constant per query row, which is how PCA-projected
+        rows score (see quantization.project_queries).
+        """
+        queries=np.asarray(queries,dtype=np.float32).reshape(-1,self.dim)
+        offset=float(np.mean(offsets)) if offsets is not None and len(offsets) else 0.0
+        with self._lock:
+            self._compact()
+            live=np.flatnonzero(self._lengths)
+            if not len(live) or not len(queries) or k<=0:
+                return []
+
+            if candidates and len(live)>candidates:
+                coarse=(self._centroid_matrix()@queries.mean(axis=0))[live]
+                live=np.sort(live[np.argpartition(-coarse,candidates-1)[:candidates]])
+
+            scores=self._score_slots(queries,live)+offset
+            top=min(k,len(live))
+            order=np.argpartition(-scores,top-1)[:top]
+            order=order[np.argsort(-scores[order],kind="stable")]
+            return [
+                (self.keys[live[index]],round(float((scores[index]+1)/2)*100,2))
+                for index in order
+            ]
@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ResumeAnalysisConfig(AppConfig):
     name = 'resume_analysis'
+
+    def ready(self):
+        from . import search
+        search.register()
+
+        if not settings.MODEL_PRELOAD:
+            return
+
+        from coreengine.controller import register_models
+        from coreengine.registry import model_registry
+        register_models()
+        model_registry.warmup(settings.MODEL_WARMUP)
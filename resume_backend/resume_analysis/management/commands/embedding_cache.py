@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from coreengine.chunknizer import encoder_chunks
+from coreengine.engine import semantic_engine
+from coreengine.extraction import extract
+from resume_analysis.models import Resume, ResumeAnalysis
+
+
+class Command(BaseCommand):
+    help = "Inspect, warm or prune the chunk embedding cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["stats", "warm", "prune", "clear"])
+        parser.add_argument(
+            "--max-items",
+            type=int,
+            help="prune: number of newest disk entries to keep.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="warm: only embed the most recent N resumes and JDs.",
+        )
+
+    def handle(self, *args, **options):
+        cache = semantic_engine.cache()
+        action = options["action"]
+
+        if action == "warm":
+            self._warm(options["limit"])
+        elif action == "prune":
+            if options["max_items"] is None:
+                raise CommandError("prune requires --max-items.")
+            removed = cache.prune(options["max_items"])
+            self.stdout.write(f"Removed {removed} disk entries.")
+        elif action == "clear":
+            cache.clear()
+            self.stdout.write("Embedding cache cleared.")
+
+        for name, value in cache.stats().items():
+            self.stdout.write(f"{name}: {value}")
+
+    def _warm(self, limit):
+        jd_texts = (
+            ResumeAnalysis.objects.exclude(jd_text__isnull=True)
+            .exclude(jd_text="")
+            .order_by("-created_at")
+            .values_list("jd_text", flat=True)
+            .distinct()
+        )
+        resumes = Resume.objects.order_by("-uploaded_at")
+        if limit:
+            jd_texts = jd_texts[:limit]
+            resumes = resumes[:limit]
+
+        chunks = 0
+        for jd_text in jd_texts:
+            jd_chunks = encoder_chunks(jd_text)
+            if jd_chunks:
+                semantic_engine.encode(jd_chunks)
+            chunks += len(jd_chunks)
+
+        for resume in resumes:
+            try:
+                text = extract(resume.file.path)
+            except (FileNotFoundError, RuntimeError, ValueError) as e:
+                self.stderr.write(f"Skipping resume {resume.id}: {e}")
+                continue
+            if not text.strip():
+                continue
+            resume_chunks = encoder_chunks(text)
+            if resume_chunks:
+                semantic_engine.encode(resume_chunks)
+            chunks += len(resume_chunks)
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {chunks} chunk(s)."))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from coreengine.chunknizer import encoder_chunks
+from coreengine.engine import semantic_engine
+from coreengine.extraction import extract
+from resume_analysis.models import Resume
+from resume_analysis.services import store_resume_embeddings
+
+
+class Command(BaseCommand):
+    help = "Store chunk embeddings for resumes that are not yet searchable by JD."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Re-embed every resume, not only missing or stale ones.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Only index the most recent N resumes.",
+        )
+
+    def handle(self, *args, **options):
+        model_name = semantic_engine.cache_namespace()
+        projection = semantic_engine.projection()
+        resumes = Resume.objects.order_by("-uploaded_at")
+        if not options["rebuild"]:
+            resumes = resumes.exclude(
+                embedding__model_name=model_name,
+                embedding__projection=projection.version if projection is not None else "",
+            )
+        if options["limit"]:
+            resumes = resumes[:options["limit"]]
+
+        indexed = 0
+        for resume in resumes.iterator():
+            try:
+                text = extract(resume.file.path)
+            except (FileNotFoundError, RuntimeError, ValueError) as e:
+                self.stderr.write(f"Skipping resume {resume.id}: {e}")
+                continue
+            chunks = encoder_chunks(text) if text.strip() else []
+            if not chunks:
+                continue
+            store_resume_embeddings(resume, semantic_engine.encode(chunks), model_name)
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} resume(s)."))
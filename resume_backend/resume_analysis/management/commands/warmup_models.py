@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from coreengine.controller import register_models
+from coreengine.registry import model_registry
+
+
+class Command(BaseCommand):
+    help = "Load the core engine models now instead of on the first request."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Registry names to load (default: settings.MODEL_WARMUP).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Load every registered model.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            names = None
+        else:
+            names = options["models"] or settings.MODEL_WARMUP
+
+        register_models()
+        try:
+            loaded = model_registry.warmup(names)
+        except KeyError as e:
+            raise CommandError(str(e)) from e
+
+        status = model_registry.status()
+        for name in loaded:
+            self.stdout.write(f"{name}: loaded in {status[name]['load_seconds']}s")
+        self.stdout.write(self.style.SUCCESS(f"Warmed up {len(loaded)} model(s)."))
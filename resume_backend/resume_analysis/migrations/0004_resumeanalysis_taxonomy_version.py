@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_analysis', '0003_resumeanalysis_extra_skill_resumeanalysis_jd_score_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='taxonomy_version',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+    ]
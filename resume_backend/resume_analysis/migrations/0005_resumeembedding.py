@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_analysis', '0004_resumeanalysis_taxonomy_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeEmbedding',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='resume_analysis.resume')),
+                ('model_name', models.CharField(db_index=True, max_length=255)),
+                ('dim', models.IntegerField()),
+                ('chunk_count', models.IntegerField()),
+                ('vectors', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
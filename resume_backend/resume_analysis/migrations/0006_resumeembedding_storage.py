@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_analysis', '0005_resumeembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='storage',
+            field=models.CharField(default='float16', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='projection',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='scales',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -35,6 +35,7 @@ class ResumeAnalysis(models.Model):
     total_required_skill=models.IntegerField(null=True, blank=True)
     total_matched_skill=models.IntegerField(null=True, blank=True)
     ai_enabled=models.BooleanField(default=True)
+    taxonomy_version=models.CharField(max_length=32, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
 
@@ -44,6 +45,23 @@ class ResumeAnalysis(models.Model):
 
     def __str__(self):
         return f"Analysis {self.resume.user.email} - Version {self.version}"
+
+
+class ResumeEmbedding(models.Model):
+    # Chunk embeddings of the resume text for JD search, in the compact form
+    # from semantic_engine.compact (see coreengine.quantization).
+    resume = models.OneToOneField(Resume, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    model_name = models.CharField(max_length=255, db_index=True)
+    storage = models.CharField(max_length=16, default='float16')
+    projection = models.CharField(max_length=64, blank=True, default='')
+    dim = models.IntegerField()
+    chunk_count = models.IntegerField()
+    vectors = models.BinaryField()
+    scales = models.BinaryField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Embedding {self.resume_id} ({self.chunk_count} chunks)"
     
 
 # Create your models here.
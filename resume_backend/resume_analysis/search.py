@@ -0,0 +1,91 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+
+from coreengine.chunknizer import encoder_chunks
+from coreengine.engine import semantic_engine
+from coreengine.registry import model_registry
+from coreengine.quantization import compact_embeddings, project_queries
+from coreengine.vector_index import vector_index
+from .models import Resume, ResumeEmbedding
+
+# Rows committed slightly out of updated_at order are still picked up.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class resume_search:
+    """vector_index over ResumeEmbedding rows, kept in sync with the database.
+
+    Each search first pulls rows updated since the last sync, so an analysis
+    saved by any worker is searchable on the next request.
+    """
+
+    def __init__(self, model_name, projection=None):
+        self.model_name = model_name
+        self.projection = projection
+        self.index = None
+        self._seen = {}
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        with self._lock:
+            # Rows stored under another projection live in a different space;
+            # index_resumes --rebuild brings them over.
+            rows = ResumeEmbedding.objects.filter(
+                model_name=self.model_name,
+                projection=self.projection.version if self.projection is not None else "",
+            )
+            if self._watermark is not None:
+                rows = rows.filter(updated_at__gte=self._watermark - SYNC_OVERLAP)
+
+            for resume_id, storage, dim, vectors, scales, updated_at in rows.values_list(
+                "resume_id", "storage", "dim", "vectors", "scales", "updated_at"
+            ).iterator():
+                if self._seen.get(resume_id) == updated_at:
+                    continue
+                if self.index is None:
+                    self.index = vector_index(dim, semantic_engine.storage())
+                # Kept compact in the index too; rows stored under another
+                # EMBEDDING_STORAGE are converted on the way in.
+                self.index.add(resume_id, compact_embeddings.from_bytes(storage, dim, vectors, scales))
+                self._seen[resume_id] = updated_at
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+
+    def search(self, jd_text, k=10):
+        self.sync()
+        if self.index is None:
+            return []
+
+        jd_chunks = encoder_chunks(jd_text)
+        if not jd_chunks:
+            return []
+        queries, offsets = project_queries(semantic_engine.encode(jd_chunks), self.projection)
+        candidates = settings.RESUME_INDEX_CANDIDATES or None
+
+        while True:
+            hits = self.index.search(queries, k, candidates, offsets)
+            resumes = Resume.objects.in_bulk([resume_id for resume_id, _ in hits])
+            missing = [resume_id for resume_id, _ in hits if resume_id not in resumes]
+            if not missing:
+                return [(resumes[resume_id], score) for resume_id, score in hits]
+            # Deleted since they were indexed.
+            for resume_id in missing:
+                self.index.remove(resume_id)
+                self._seen.pop(resume_id, None)
+
+    def __len__(self):
+        return len(self.index) if self.index is not None else 0
+
+
+def _load_resume_search():
+    search = resume_search(semantic_engine.cache_namespace(), semantic_engine.projection())
+    search.sync()
+    return search
+
+
+def register():
+    """Register the "resume_index" loader; called from the app's ready()."""
+    model_registry.register("resume_index", _load_resume_search)
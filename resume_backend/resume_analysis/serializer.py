@@ -6,7 +6,7 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ResumeAnalysis
-        fields = ['id', 'version', 'hard_score', 'soft_score', 'total_score', 'skills_json', 'sections_json', 'experience_json', 'jd_text', 'ai_enabled', 'created_at', 'data']
+        fields = ['id', 'version', 'hard_score', 'soft_score', 'total_score', 'skills_json', 'sections_json', 'experience_json', 'jd_text', 'ai_enabled', 'taxonomy_version', 'created_at', 'data']
 
     def get_data(self, obj):
         """Transform stored data into the format expected by the frontend"""
@@ -1,5 +1,6 @@
 from django.db.models import Max
-from .models import ResumeAnalysis
+from coreengine.engine import semantic_engine
+from .models import ResumeAnalysis, ResumeEmbedding
 
 def create_analysis(resume, result_dict,jd_dict=None, ai_enabled=False, jd_text=None):
     latest_version = ResumeAnalysis.objects.filter(resume=resume).aggregate(Max('version'))['version__max']
@@ -22,6 +23,7 @@ def create_analysis(resume, result_dict,jd_dict=None, ai_enabled=False, jd_text=
         experience_json=result_dict["experience"],
         jd_text=jd_text,
         ai_enabled=ai_enabled,
+        taxonomy_version=result_dict.get("taxonomy_version"),
         matched_skill=jd_dict.get("matched_skills") if jd_dict else None,
         missing_skill=jd_dict.get("missing_skills") if jd_dict else None,
         extra_skill=jd_dict.get("extra_skills") if jd_dict else None,
@@ -31,3 +33,19 @@ def create_analysis(resume, result_dict,jd_dict=None, ai_enabled=False, jd_text=
 
     )
 
+
+def store_resume_embeddings(resume, embeddings, model_name=None):
+    compact = semantic_engine.compact(embeddings)
+    vectors, scales = compact.to_bytes()
+    return ResumeEmbedding.objects.update_or_create(
+        resume=resume,
+        defaults={
+            "model_name": model_name or semantic_engine.cache_namespace(),
+            "storage": compact.storage,
+            "projection": compact.projection.version if compact.projection is not None else "",
+            "dim": compact.dim,
+            "chunk_count": len(compact),
+            "vectors": vectors,
+            "scales": scales,
+        }
+    )[0]
@@ -1,3 +1,513 @@
-from django.test import TestCase
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import docx
+import fitz
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from benchmarks.bench_skill_detection import build_corpus, legacy_skill_detection
+from coreengine import controller, extraction, result_cache, skill_matcher, taxonomy
+from coreengine.detection import detection, skill_detection
+from coreengine.embedding_cache import embedding_cache
+from coreengine.engine import semantic_engine
+from coreengine.extraction import content_hash, extract, extract_text_doc, iter_docx_text, open_source
+from coreengine.quantization import compact_embeddings
+from coreengine.sidecar import sidecar_encoder, sidecar_server
+from coreengine.single_flight import single_flight
+from coreengine.stages import stage_graph
+from coreengine.vector_index import vector_index
+from resume_analysis.views import MetricsView
+
+
+def unit_vectors(rng, rows, dim=32):
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+
+def docx_bytes(parts):
+    """A zip holding just the given word/*.xml parts, each a list of paragraph texts or raw XML."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, paragraphs in parts.items():
+            xml = "".join(p if p.startswith("<") else f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+            if name == "word/document.xml":
+                xml = f"<w:body>{xml}</w:body>"
+            archive.writestr(name, f'<w:root xmlns:w="{W_NS}" xmlns:mc="{MC_NS}">{xml}</w:root>')
+    return buffer.getvalue()
+
+
+class TemporaryDirectoryMixin:
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+
+class SkillDetectionTests(SimpleTestCase):
+    """The compiled matcher must give what the per-variant regex scan gave."""
+
+    RESUMES = [
+        "SKILLS\nPython3, Node.js, ReactJS, C++, C#, CI/CD, scikit-learn, k8s\n"
+        "EXPERIENCE\nBuilt REST APIs with Django and FastAPI; deployed on AWS (amazon web services).\n"
+        "Migrated next.js apps to Vue.js; wrote unit-tests with PyTest.\n"
+        "PROJECTS\nA springboot + postgre sql service. GitHub Actions, TCP/IP, GNU/Linux.",
+        "Technical Skills\nJAVA SE / Java EE, machine-learning, natural-language processing, power bi\n"
+        "Work Experience\nReactNative and react-native apps; open telemetry tracing; Event-Driven Architecture.\n"
+        "Led the ci-cd rollout... python, python, PYTHON!",
+        "EDUCATION\nB.Sc. Computer Science\nSKILLS\ngo, rust, c, js, ml, eda, ue\n",
+        "no sections here, just python and docker",
+    ]
+
+    def test_matches_legacy_detection_on_fixture_resumes(self):
+        for text in self.RESUMES:
+            sections = detection(text)
+            with self.subTest(text=text[:30]):
+                self.assertEqual(skill_detection(sections), legacy_skill_detection(sections))
+
+    def test_matches_legacy_detection_on_generated_sections(self):
+        for sections in build_corpus(size=20):
+            expected = legacy_skill_detection(sections)
+            found = skill_detection(sections)
+            self.assertEqual(found, expected)
+            self.assertEqual(list(found), list(expected))
+
+
+class TaxonomyArtifactTests(TemporaryDirectoryMixin, SimpleTestCase):
+    SKILLS = {"languages": {"python": ["python", "python3"], "go": ["golang", "go lang"]}}
+
+    def test_compiled_artifact_round_trips(self):
+        compiled = taxonomy.compile_taxonomy(self.SKILLS)
+        path = taxonomy.write_taxonomy(compiled, Path(self.directory) / "taxonomy.json")
+        self.assertEqual(taxonomy.load_taxonomy(path), compiled)
+        self.assertEqual(taxonomy.read_taxonomy(path)["version"], taxonomy.taxonomy_version(self.SKILLS))
+
+    def test_artifact_with_another_format_is_rejected_or_rebuilt(self):
+        stale = dict(taxonomy.compile_taxonomy(), format=taxonomy.ARTIFACT_FORMAT - 1)
+        path = taxonomy.write_taxonomy(stale, Path(self.directory) / "taxonomy.json")
+
+        # An explicitly configured artifact is trusted, so a bad one is an error...
+        with self.assertRaises(taxonomy.taxonomyerror):
+            taxonomy.load_taxonomy(path)
+        # ...while the bundled one is recompiled from skill_db.
+        with mock.patch.object(taxonomy, "DEFAULT_ARTIFACT_PATH", path):
+            self.assertEqual(taxonomy.load_taxonomy(), taxonomy.compile_taxonomy())
+
+    def test_matcher_picks_up_a_rewritten_artifact(self):
+        path = Path(self.directory) / "taxonomy.json"
+        taxonomy.write_taxonomy(taxonomy.compile_taxonomy(self.SKILLS), path)
+        self.addCleanup(skill_matcher.reload_skill_matcher)  # runs after the patches are undone
+
+        with mock.patch.dict(os.environ, {"SKILL_TAXONOMY_PATH": str(path)}), \
+                mock.patch.object(skill_matcher, "RELOAD_INTERVAL", 0):
+            skill_matcher.reload_skill_matcher()
+            self.assertEqual(skill_matcher.get_skill_matcher().match("python and golang"),
+                             {"languages": {"python": 1, "go": 1}})
+
+            rewritten = {"languages": dict(self.SKILLS["languages"], rust=["rust", "rustlang"])}
+            taxonomy.write_taxonomy(taxonomy.compile_taxonomy(rewritten), path)
+            self.assertEqual(skill_matcher.get_skill_matcher().match("rust and golang"),
+                             {"languages": {"go": 1, "rust": 1}})
+
+
+class ExtractionSourceTests(TemporaryDirectoryMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), "EXPERIENCE\nPython developer")
+            self.pdf = doc.tobytes()
+        self.path = os.path.join(self.directory, "resume.pdf")
+        with open(self.path, "wb") as handle:
+            handle.write(self.pdf)
+
+    def test_every_kind_of_source_gives_the_same_text(self):
+        upload = TemporaryUploadedFile("resume.pdf", "application/pdf", len(self.pdf), None)
+        upload.write(self.pdf)
+        upload.flush()
+        self.addCleanup(upload.close)
+        sources = {
+            "path": self.path,
+            "bytes": self.pdf,
+            "memory upload": SimpleUploadedFile("resume.pdf", self.pdf),
+            "spooled upload": upload,
+            "file handle": open(self.path, "rb"),
+        }
+        self.addCleanup(sources["file handle"].close)
+
+        expected_hash = content_hash(self.pdf)
+        for kind, source in sources.items():
+            with self.subTest(kind=kind):
+                self.assertEqual(extract(source, ".pdf"), "EXPERIENCE\nPython developer")
+                self.assertEqual(content_hash(source), expected_hash)
+
+    def test_open_source_passes_paths_and_handles_through(self):
+        with open_source(self.path) as source:
+            self.assertEqual(source, self.path)
+        with open_source(self.pdf) as source:
+            self.assertIs(source, self.pdf)
+        with open_source(SimpleUploadedFile("resume.pdf", self.pdf)) as source:
+            self.assertEqual(source, self.pdf)
+        with open(self.path, "rb") as handle, open_source(handle) as source:
+            self.assertIs(source, handle)
+        with self.assertRaises(FileNotFoundError):
+            with open_source(os.path.join(self.directory, "missing.pdf")):
+                pass
+
+    def test_large_files_are_memory_mapped(self):
+        path = os.path.join(self.directory, "large.bin")
+        for size, mapped in ((extraction.MMAP_THRESHOLD - 1, False), (extraction.MMAP_THRESHOLD, True)):
+            with open(path, "wb") as handle:
+                handle.truncate(size)
+            with self.subTest(size=size), open(path, "rb") as handle, extraction._mapped(handle) as contents:
+                self.assertEqual(isinstance(contents, mmap.mmap), mapped)
+                self.assertEqual(len(contents), size)
+
+    def test_pdf_is_read_from_the_mapping(self):
+        with mock.patch.object(extraction, "MMAP_THRESHOLD", 0), open(self.path, "rb") as handle:
+            self.assertEqual(extract(handle, ".pdf"), "EXPERIENCE\nPython developer")
+
+
+class DocxExtractionTests(SimpleTestCase):
+    def test_matches_python_docx_on_body_paragraphs(self):
+        document = docx.Document()
+        document.add_paragraph("Jane Doe")
+        document.add_paragraph("")
+        document.add_paragraph("EXPERIENCE")
+        paragraph = document.add_paragraph("Python developer")
+        paragraph.add_run().add_tab()
+        paragraph.add_run("2019 - 2024").add_break()
+        paragraph.add_run("Django, Docker & AWS <cloud>")
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        # What extract_text_doc returned when it was built on python-docx.
+        expected = "".join(p.text + "\n" for p in docx.Document(io.BytesIO(buffer.getvalue())).paragraphs)
+        self.assertEqual(extract_text_doc(buffer.getvalue()), expected)
+
+    def test_headers_then_body_then_footers(self):
+        data = docx_bytes({
+            "word/footer1.xml": ["Page 1"],
+            "word/document.xml": ["EXPERIENCE", "Python developer"],
+            "word/header1.xml": ["Jane Doe"],
+        })
+        self.assertEqual(list(iter_docx_text(data)), ["Jane Doe", "EXPERIENCE", "Python developer", "Page 1"])
+
+    def test_text_box_fallback_copy_is_skipped(self):
+        box = "<w:txbxContent><w:p><w:r><w:t>Kubernetes</w:t></w:r></w:p></w:txbxContent>"
+        data = docx_bytes({"word/document.xml": [
+            "SKILLS",
+            "<w:p><w:r><w:t>Docker</w:t></w:r><w:r><mc:AlternateContent>"
+            f"<mc:Choice>{box}</mc:Choice><mc:Fallback><w:pict>{box}</w:pict></mc:Fallback>"
+            "</mc:AlternateContent></w:r></w:p>",
+        ]})
+        self.assertEqual(list(iter_docx_text(data)), ["SKILLS", "Kubernetes", "Docker"])
+
+    def test_repeated_header_and_footer_parts_are_emitted_once(self):
+        data = docx_bytes({
+            "word/header1.xml": ["Jane Doe", "jane@example.com"],
+            "word/header2.xml": ["Jane Doe", "jane@example.com"],  # first-page copy
+            "word/header3.xml": ["Jane Doe"],
+            "word/document.xml": ["EXPERIENCE", "Python developer"],
+            "word/footer1.xml": ["Page"],
+            "word/footer2.xml": ["Page"],
+        })
+        self.assertEqual(
+            list(iter_docx_text(data)),
+            ["Jane Doe", "jane@example.com", "Jane Doe", "EXPERIENCE", "Python developer", "Page"],
+        )
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "results": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "result-cache-tests"},
+})
+class ResultCacheTests(SimpleTestCase):
+    RESUME = "EXPERIENCE\nPython developer, 2019 - 2024\nSKILLS\nPython, Django, Docker"
+
+    def setUp(self):
+        caches["results"].clear()
+        self.extracted = mock.patch.object(controller, "_timed_extract", return_value=self.RESUME).start()
+        self.analyzed = mock.patch.object(controller, "add_analysis_stages", wraps=controller.add_analysis_stages).start()
+        rng = np.random.default_rng(3)
+        mock.patch.object(semantic_engine, "encode", lambda chunks: unit_vectors(rng, len(chunks))).start()
+        self.scored = mock.patch.object(semantic_engine, "compute_semantic_score", return_value=61.5).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def analyze(self, ai_enabled=False, jd=None):
+        return controller.process_resume(b"%PDF resume", ai_enabled, jd, ext=".pdf")
+
+    def test_second_call_is_served_from_the_cache(self):
+        first = self.analyze(ai_enabled=True, jd="python developer")
+        second = self.analyze(ai_enabled=True, jd="python developer")
+
+        self.assertEqual(self.extracted.call_count, 1)
+        self.assertEqual(self.analyzed.call_count, 1)
+        self.assertEqual(self.scored.call_count, 1)
+        self.assertEqual(second["skills"], first["skills"])
+        self.assertEqual(second["final_score"], first["final_score"])
+
+    def test_changing_the_jd_or_ai_toggle_recomputes_the_score(self):
+        self.analyze(ai_enabled=False)
+        self.assertEqual(self.scored.call_count, 0)
+
+        self.analyze(ai_enabled=True, jd="python developer")
+        self.analyze(ai_enabled=True, jd="go developer")
+        self.assertEqual(self.scored.call_count, 2)
+        # Parsing only depends on the resume.
+        self.assertEqual(self.analyzed.call_count, 1)
+
+    def test_failing_backend_falls_back_to_computing(self):
+        broken = mock.Mock(**{
+            f"{method}.side_effect": ConnectionError("cache down")
+            for method in ("get", "get_many", "set", "set_many")
+        })
+        with mock.patch.object(result_cache, "_backend", return_value=broken), self.assertLogs(result_cache.logger, "WARNING"):
+            self.assertEqual(result_cache.cached("text", ("key",), lambda: "computed"), "computed")
+            first = self.analyze(ai_enabled=True, jd="python developer")
+            second = self.analyze(ai_enabled=True, jd="python developer")
+
+        self.assertEqual(self.analyzed.call_count, 2)
+        self.assertEqual(self.scored.call_count, 2)
+        self.assertEqual(second["final_score"], first["final_score"])
+
+
+class SidecarEncoderTests(TemporaryDirectoryMixin, SimpleTestCase):
+    def test_fallback_is_dropped_once_the_sidecar_answers(self):
+        built = []
+
+        class local_encoder:
+            def encode(self, texts):
+                return np.zeros((len(texts), 4), dtype=np.float32)
+
+        def factory():
+            built.append(1)
+            return local_encoder()
+
+        path = os.path.join(self.directory, "encoder.sock")
+        encoder = sidecar_encoder(path, factory, timeout=5, retry_after=0)
+        self.assertEqual(encoder.encode(["a"]).shape, (1, 4))  # no sidecar yet
+        self.assertEqual(len(built), 1)
+
+        server = sidecar_server(path, lambda texts: np.ones((len(texts), 4), dtype=np.float32))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        np.testing.assert_array_equal(encoder.encode(["a", "b"]), np.ones((2, 4)))
+        self.assertIsNone(encoder._fallback)
+        self.assertEqual(len(built), 1)
+
+
+class SingleFlightTests(TemporaryDirectoryMixin, SimpleTestCase):
+    def test_concurrent_calls_on_one_key_compute_once(self):
+        flight = single_flight(self.directory, timeout=10)
+        computed = []
+        entered = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            computed.append(threading.get_ident())
+            entered.set()
+            release.wait(10)
+            return {"score": 42}
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        first.start()
+        self.assertTrue(entered.wait(10))
+        second = threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        second.start()
+        time.sleep(0.2)  # let the second call join the one in flight
+        release.set()
+        first.join(10)
+        second.join(10)
+
+        self.assertEqual(len(computed), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True])
+        self.assertTrue(all(value == {"score": 42} for value, _ in results))
+        self.assertEqual(flight.coalesced, 1)
+
+    def test_different_keys_do_not_coalesce(self):
+        flight = single_flight(self.directory)
+        self.assertEqual(flight.do("a", lambda: 1), (1, False))
+        self.assertEqual(flight.do("b", lambda: 2), (2, False))
+
+    def test_result_is_only_written_for_waiters(self):
+        flight = single_flight(self.directory)
+        flight.do("key", lambda: {"score": 1})
+        self.assertFalse(list(flight.directory.glob("*.result")))
+
+    def test_exception_reaches_caller_and_is_not_cached(self):
+        flight = single_flight(self.directory)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: 3), (3, False))
+
+
+class EmbeddingCacheTests(TemporaryDirectoryMixin, SimpleTestCase):
+    def vector(self, value):
+        return np.full(4, value, dtype=np.float32)
+
+    def test_second_instance_replays_writes_of_the_first(self):
+        writer = embedding_cache(self.directory, memory_items=0, disk_items=10)
+        reader = embedding_cache(self.directory, memory_items=0, disk_items=10)
+
+        writer.put_many(["python developer", "django apis"], [self.vector(1), self.vector(2)])
+        found = reader.get_many(["python developer", "django apis", "go services"])
+        np.testing.assert_array_equal(found[0], self.vector(1))
+        np.testing.assert_array_equal(found[1], self.vector(2))
+        self.assertIsNone(found[2])
+
+        # Written after the reader last synced.
+        writer.put_many(["go services"], [self.vector(3)])
+        np.testing.assert_array_equal(reader.get_many(["go services"])[0], self.vector(3))
+
+    def test_disk_tier_evicts_oldest_rows(self):
+        writer = embedding_cache(self.directory, memory_items=0, disk_items=3)
+        for index in range(5):
+            writer.put_many([f"chunk {index}"], [self.vector(index)])
+
+        reader = embedding_cache(self.directory, memory_items=0, disk_items=3)
+        found = reader.get_many([f"chunk {index}" for index in range(5)])
+        self.assertEqual([vector is not None for vector in found], [False, False, True, True, True])
+        self.assertEqual(writer.stats()["disk_evictions"], 2)
+        self.assertEqual(reader.stats()["disk_items"], 3)
+
+    def test_index_log_stays_bounded(self):
+        writer = embedding_cache(self.directory, memory_items=0, disk_items=4)
+        for index in range(25):
+            writer.put_many([f"chunk {index}"], [self.vector(index)])
+            with open(writer._log_path) as handle:
+                self.assertLessEqual(sum(1 for _ in handle), 8)
+
+        # Compaction keeps the ring order: the next write replaces the oldest.
+        reader = embedding_cache(self.directory, memory_items=0, disk_items=4)
+        reader.put_many(["new chunk"], [self.vector(99)])
+        found = writer.get_many([f"chunk {index}" for index in range(21, 25)] + ["new chunk"])
+        self.assertEqual([vector is not None for vector in found], [False, True, True, True, True])
+
+    def test_memory_tier_is_bounded(self):
+        cache = embedding_cache(self.directory, memory_items=2, disk_items=0)
+        cache.put_many(["a", "b", "c"], [self.vector(1), self.vector(2), self.vector(3)])
+        self.assertEqual(cache.stats()["memory_items"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get_many(["a"])[0])
+
+
+class VectorIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.resumes = {f"resume-{index}": unit_vectors(rng, rng.integers(1, 12)) for index in range(40)}
+        self.jd = unit_vectors(rng, 5)
+
+    def expected(self, storage):
+        scores = {}
+        for key, chunks in self.resumes.items():
+            stored = compact_embeddings.compress(chunks, storage)
+            scores[key] = semantic_engine.compute_semantic_score(
+                ["chunk"] * len(chunks), ["jd"] * len(self.jd),
+                jd_embeddings=self.jd, resume_embeddings=stored,
+            )
+        return scores
+
+    def test_exact_search_matches_compute_semantic_score(self):
+        for storage in ("float32", "float16", "int8"):
+            with self.subTest(storage=storage):
+                index = vector_index(32, storage, block_rows=50)  # several blocks
+                for key, chunks in self.resumes.items():
+                    index.add(key, chunks)
+
+                hits = index.search(self.jd, k=len(self.resumes), candidates=None)
+                expected = self.expected(storage)
+                self.assertEqual(len(hits), len(self.resumes))
+                for key, score in hits:
+                    self.assertAlmostEqual(score, expected[key], delta=0.011)
+                self.assertEqual([score for _, score in hits], sorted((score for _, score in hits), reverse=True))
+
+    def test_removed_and_replaced_resumes(self):
+        index = vector_index(32, "float32")
+        for key, chunks in self.resumes.items():
+            index.add(key, chunks)
+        index.search(self.jd, k=1)  # compacts
+
+        index.remove("resume-0")
+        index.add("resume-1", self.jd)  # a perfect match now
+        hits = index.search(self.jd, k=len(self.resumes))
+        self.assertNotIn("resume-0", [key for key, _ in hits])
+        self.assertEqual(hits[0], ("resume-1", 100.0))
+        self.assertEqual(len(index), len(self.resumes) - 1)
+
+
+class StageGraphTests(SimpleTestCase):
+    def build(self):
+        def slow(value):
+            time.sleep(0.01)
+            return value
+
+        graph = stage_graph()
+        graph.add("words", lambda text: text.split(), "text")
+        graph.add("count", lambda words: slow(len(words)), "words")
+        graph.add("upper", lambda words: slow([word.upper() for word in words]), "words")
+        graph.add("longest", lambda words: max(words, key=len), "words", inline=True)
+        graph.add("summary", lambda count, upper, longest: (count, upper[0], longest), "count", "upper", "longest")
+        return graph
+
+    def test_pooled_run_matches_serial_run(self):
+        values = {"text": "python django rest apis on aws"}
+        serial = self.build().run(values)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pooled = self.build().run(values, executor)
+        self.assertEqual(serial, pooled)
+        self.assertEqual(serial["summary"], (6, "PYTHON", "python"))
+
+    def test_given_values_are_not_recomputed(self):
+        values = self.build().run({"text": "a b", "count": 99})
+        self.assertEqual(values["summary"][0], 99)
+
+    def test_missing_input_is_reported(self):
+        with self.assertRaises(ValueError):
+            self.build().run({})
+
+    def test_stage_failure_propagates(self):
+        graph = self.build()
+        graph.add("broken", lambda count: 1 / 0, "count")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with self.assertRaises(ZeroDivisionError):
+                graph.run({"text": "a b"}, executor)
+
+
+class MetricsViewTests(SimpleTestCase):
+    def get(self, **headers):
+        return MetricsView.as_view()(RequestFactory().get("/metrics", headers=headers))
+
+    @override_settings(METRICS_TOKEN="")
+    def test_disabled_without_a_token(self):
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.get(authorization="Bearer ").status_code, 404)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required(self):
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(authorization="Bearer wrong").status_code, 401)
+        response = self.get(authorization="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
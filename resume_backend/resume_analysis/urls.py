@@ -1,5 +1,5 @@
 from django.urls import include, path
-from .views import ResumeAnalysisView, ResumeViewSet, ResumeAnalysisViewSet
+from .views import ResumeAnalysisView, ResumeViewSet, ResumeAnalysisViewSet, ModelReadinessView, MultiJDAnalysisView, ResumeSearchView
 from rest_framework.routers import DefaultRouter
 router = DefaultRouter()
 router.register(r'resumes', ResumeViewSet, basename='resume')
@@ -7,4 +7,7 @@ router.register(r'analyses', ResumeAnalysisViewSet, basename='analysis')
 urlpatterns = [
     path("", include(router.urls)),
     path("analyze/", ResumeAnalysisView.as_view(), name="resume-analyze"),
+    path("analyze/multi-jd/", MultiJDAnalysisView.as_view(), name="resume-analyze-multi-jd"),
+    path("search/", ResumeSearchView.as_view(), name="resume-search"),
+    path("ready/", ModelReadinessView.as_view(), name="model-readiness"),
 ]
@@ -1,20 +1,28 @@
 from rest_framework.views import APIView
 from rest_framework import viewsets
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework import status
+from rest_framework import serializers, status
 from .models import Resume, ResumeAnalysis
 from .serializer import ResumeSerializer, ResumeAnalysisSerializer
-from .services import create_analysis
+from .services import create_analysis, store_resume_embeddings
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
 from django.db import transaction
 from rest_framework.decorators import action
 import os
-import tempfile
+import hmac
+import json
 import logging
+import time
 
-from coreengine.controller import process_resume,jd_matching
+from coreengine.controller import process_resume,process_resume_multi_jd,jd_matching
+from coreengine.extraction import content_hash
+from coreengine.single_flight import get_single_flight
+from coreengine import metrics, result_cache
+from coreengine.registry import model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -30,18 +38,7 @@ class ResumeAnalysisView(APIView):
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
     }
 
-    def post(self, request):
-        file = request.FILES.get("file")
-        jd_requirement = request.data.get("job_description")
-        ai_enabled = request.data.get("ai_enabled", "false").lower() == ""
-        if jd_requirement:
-            jd_requirement = jd_requirement.replace("\n", " ").strip()
-        else:
-            jd_requirement=None
-        # ---------------------------
-        # FILE VALIDATION
-        # ---------------------------
-
+    def validate_upload(self, file):
         if not file:
             return Response(
                 {
@@ -90,66 +87,81 @@ class ResumeAnalysisView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return None
+
+    def upload_extension(self, file):
+        return os.path.splitext(file.name.lower())[1]
+
+    def with_timings(self, request, response_data, timings, **extra):
+        # Staff can ask for a per-stage breakdown with ?timings=true.
+        requested = str(request.query_params.get("timings", "")).lower() in ("1", "true", "yes", "on")
+        if not (requested and request.user.is_staff):
+            return response_data
+        return {
+            **response_data,
+            "timings": {
+                "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+                **extra,
+            },
+        }
 
+    def analyze(self, request, file, jd_requirement, ai_enabled, file_hash):
+        """Run and persist one analysis; returns (response data, status)."""
         # ---------------------------
-        # SAVE TEMP FILE
+        # JD NORMALIZATION (Policy Layer)
         # ---------------------------
 
-        _, ext = os.path.splitext(file.name.lower())
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-            for chunk in file.chunks():
-                temp_file.write(chunk)
-            temp_file_path = temp_file.name
+        # if jd_requirement:
+        #     jd_line = jd_requirement.replace("\n", " ").strip()
+        #     jd_requirements = [jd_line] if jd_line else get_default_jd()
+        
 
-        try:
-            # ---------------------------
-            # JD NORMALIZATION (Policy Layer)
-            # ---------------------------
-
-            # if jd_requirement:
-            #     jd_line = jd_requirement.replace("\n", " ").strip()
-            #     jd_requirements = [jd_line] if jd_line else get_default_jd()
-            
-
-            # ---------------------------
-            # PROCESS ENGINE
-            # ---------------------------
-
-            result = process_resume(
-                temp_file_path,
-                ai_enabled=ai_enabled,
-                jd_requirements=jd_requirement
-            )
-            if jd_requirement:
+        # ---------------------------
+        # PROCESS ENGINE
+        # ---------------------------
+
+        # Parsed straight from the upload: in memory, or from the file
+        # Django already spooled to disk for large uploads.
+        result = process_resume(
+            file,
+            ai_enabled=ai_enabled,
+            jd_requirements=jd_requirement,
+            ext=self.upload_extension(file),
+            file_hash=file_hash
+        )
+        if jd_requirement:
+            with metrics.timer(metrics.STAGE_SECONDS, stage="jd_matching"):
                 job_det=jd_matching(result, jd_requirement)
-            else:
-                job_det=None
+        else:
+            job_det=None
 
-            if result.get("error"):
-                return Response(
-                    {
-                        "success": False,
-                        "error": {
-                            "code": "PROCESSING_FAILED",
-                            "message": "Unable to process resume."
-                        }
-                    },
-                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
-                )
+        if result.get("error"):
+            return (
+                {
+                    "success": False,
+                    "error": {
+                        "code": "PROCESSING_FAILED",
+                        "message": "Unable to process resume."
+                    }
+                },
+                status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
 
-            # ---------------------------
-            # DERIVED INSIGHTS
-            # ---------------------------
+        # ---------------------------
+        # DERIVED INSIGHTS
+        # ---------------------------
 
-            skills = result.get("skills", {})
-            evaluation = result.get("evaluation", {})
-            experience_score = float(result.get("experience_score") or 0)
+        skills = result.get("skills", {})
+        evaluation = result.get("evaluation", {})
+        experience_score = float(result.get("experience_score") or 0)
 
-            if hasattr(file, "seek"):
-                file.seek(0)
+        if hasattr(file, "seek"):
+            file.seek(0)
 
-            with transaction.atomic():
+        with transaction.atomic():
+            with metrics.timer(metrics.STAGE_SECONDS, stage="save_resume"):
                 resume = Resume.objects.create(user=request.user, file=file)
+            with metrics.timer(metrics.STAGE_SECONDS, stage="create_analysis"):
                 create_analysis(
                     resume=resume,
                     result_dict={
@@ -159,6 +171,7 @@ class ResumeAnalysisView(APIView):
                         "skills": skills,
                         "sections": result.get("sections", {}),
                         "experience": evaluation,
+                        "taxonomy_version": result.get("taxonomy_version"),
                     },
                     jd_dict={
                         "matched_skills": job_det.get("matched_skills") if job_det else None,
@@ -171,66 +184,217 @@ class ResumeAnalysisView(APIView):
                     ai_enabled=ai_enabled,
                     jd_text=jd_requirement.strip() if jd_requirement else None,
                 )
+            if result.get("resume_embeddings") is not None:
+                with metrics.timer(metrics.STAGE_SECONDS, stage="store_embeddings"):
+                    store_resume_embeddings(resume, result["resume_embeddings"])
+
+        # Strongest domains
+        strong_domains = sorted(
+            skills.keys(),
+            key=lambda d: sum(skills[d].values()),
+            reverse=True
+        )[:2]
+
+        # Experience tier
+        years_exp = result.get("evaluation", {}).get("experience_score", 0)
+        if years_exp < 20:
+            experience_level = "fresher"
+        elif years_exp < 50:
+            experience_level = "junior"
+        elif years_exp < 75:
+            experience_level = "mid"
+        else:
+            experience_level = "senior"
+
+        # ---------------------------
+        # FINAL RESPONSE
+        # ---------------------------
+
+        response_data = {
+            "success": True,
+            "data": {
+                # Rendered here so the response is plain JSON and can be
+                # shared with coalesced requests in other workers.
+                "analyzed_at": serializers.DateTimeField().to_representation(timezone.now()),
+                "scores": {
+                    "final": float(result.get("final_score") or 0),
+                    "breakdown": {
+                        "rule": float(evaluation.get("rule_score") or 0),
+                        "semantic": float(result.get("semantic_score") or 0),
+                        "experience": experience_score,
+                    },
+                    "confidence": float(result.get("confidence") or 0),
+                },
+                "profile": {
+                    "experience_level": experience_level,
+                    "strong_domains": strong_domains,
+                },
+                "skills_summary": evaluation.get("skill_metrics") or {
+                    "total_unique": 0,
+                    "total_mentions": 0,
+                    "domain_diversity": 0,
+                },
+                "jd_matching":{
+                    "matched_skills": job_det.get("matched_skills") if job_det else None,
+                    "missing_skills": job_det.get("missing_skills") if job_det else None,
+                    "extra_skills": job_det.get("extra_skills") if job_det else None,
+                    "jd_score": job_det.get("match_percentage") if job_det else None,
+                    "total_required_skills": job_det.get("total_required") if job_det else None,
+                    "total_matched_skills": job_det.get("total_matched") if job_det else None
+                }
+            }
+        }
+
+        return response_data, status.HTTP_200_OK
+
+    def post(self, request):
+        file = request.FILES.get("file")
+        jd_requirement = request.data.get("job_description")
+        ai_enabled = request.data.get("ai_enabled", "false").lower() == ""
+        if jd_requirement:
+            jd_requirement = jd_requirement.replace("\n", " ").strip()
+        else:
+            jd_requirement=None
+        # ---------------------------
+        # FILE VALIDATION
+        # ---------------------------
+
+        error_response = self.validate_upload(file)
+        if error_response is not None:
+            return error_response
+
+        metrics.inc(metrics.ANALYSIS_REQUESTS, view="analyze", ai_enabled=str(ai_enabled).lower())
+        try:
+            with metrics.collect_timings() as timings, metrics.timer(metrics.REQUEST_SECONDS, view="analyze"):
+                # Double-clicks and retries send the same upload twice: identical
+                # requests in flight share one analysis and one saved version.
+                file_hash = content_hash(file)
+                key = result_cache.digest(
+                    f"{request.user.pk}:{file_hash}:{jd_requirement or ''}:{int(ai_enabled)}"
+                )
+                (response_data, response_status), shared = get_single_flight().do(
+                    key,
+                    lambda: self.analyze(request, file, jd_requirement, ai_enabled, file_hash)
+                )
+            if shared:
+                metrics.inc(metrics.COALESCED_REQUESTS)
+            return Response(
+                self.with_timings(request, response_data, timings, coalesced=shared),
+                status=response_status
+            )
+
+        except Exception as e:
+            logger.exception("Resume processing failed: %s", str(e))
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "INTERNAL_ERROR",
+                        "message": "Something went wrong while analyzing the resume."
+                    }
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+class MultiJDAnalysisView(ResumeAnalysisView):
+    """Score one resume against several JDs; nothing is persisted."""
+
+    MAX_JOB_DESCRIPTIONS = 20
+
+    def get_job_descriptions(self, request):
+        values = request.data.getlist("job_descriptions") if hasattr(request.data, "getlist") else request.data.get("job_descriptions", [])
+        if isinstance(values, str):
+            values = [values]
+        # A single field may also carry a JSON array of JD strings.
+        if len(values) == 1 and values[0].lstrip().startswith("["):
+            try:
+                values = json.loads(values[0])
+            except ValueError:
+                pass
+        return [
+            value.replace("\n", " ").strip()
+            for value in values
+            if isinstance(value, str) and value.strip()
+        ]
+
+    def post(self, request):
+        file = request.FILES.get("file")
+        ai_enabled = str(request.data.get("ai_enabled", "false")).lower() in ("1", "true", "yes", "on")
+        job_descriptions = self.get_job_descriptions(request)
+
+        error_response = self.validate_upload(file)
+        if error_response is not None:
+            return error_response
+
+        if not job_descriptions or len(job_descriptions) > self.MAX_JOB_DESCRIPTIONS:
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "INVALID_JOB_DESCRIPTIONS",
+                        "message": f"Provide between 1 and {self.MAX_JOB_DESCRIPTIONS} job descriptions."
+                    }
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        metrics.inc(metrics.ANALYSIS_REQUESTS, view="multi_jd", ai_enabled=str(ai_enabled).lower())
+        try:
+            with metrics.collect_timings() as timings, metrics.timer(metrics.REQUEST_SECONDS, view="multi_jd"):
+                result = process_resume_multi_jd(
+                    file,
+                    job_descriptions,
+                    ai_enabled=ai_enabled,
+                    ext=self.upload_extension(file)
+                )
+
+            if result.get("error"):
+                return Response(
+                    {
+                        "success": False,
+                        "error": {
+                            "code": "PROCESSING_FAILED",
+                            "message": "Unable to process resume."
+                        }
+                    },
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
 
-            # Strongest domains
-            strong_domains = sorted(
-                skills.keys(),
-                key=lambda d: sum(skills[d].values()),
-                reverse=True
-            )[:2]
-
-            # Experience tier
-            years_exp = result.get("evaluation", {}).get("experience_score", 0)
-            if years_exp < 20:
-                experience_level = "fresher"
-            elif years_exp < 50:
-                experience_level = "junior"
-            elif years_exp < 75:
-                experience_level = "mid"
-            else:
-                experience_level = "senior"
-
-            # ---------------------------
-            # FINAL RESPONSE
-            # ---------------------------
+            evaluation = result.get("evaluation", {})
 
             response_data = {
                 "success": True,
                 "data": {
-                    "analyzed_at": timezone.now(),
+                    "analyzed_at": serializers.DateTimeField().to_representation(timezone.now()),
                     "scores": {
-                        "final": float(result.get("final_score") or 0),
-                        "breakdown": {
-                            "rule": float(evaluation.get("rule_score") or 0),
-                            "semantic": float(result.get("semantic_score") or 0),
-                            "experience": experience_score,
-                        },
+                        "rule": float(evaluation.get("rule_score") or 0),
+                        "experience": float(result.get("experience_score") or 0),
                         "confidence": float(result.get("confidence") or 0),
                     },
-                    "profile": {
-                        "experience_level": experience_level,
-                        "strong_domains": strong_domains,
-                    },
                     "skills_summary": evaluation.get("skill_metrics") or {
                         "total_unique": 0,
                         "total_mentions": 0,
                         "domain_diversity": 0,
                     },
-                    "jd_matching":{
-                        "matched_skills": job_det.get("matched_skills") if job_det else None,
-                        "missing_skills": job_det.get("missing_skills") if job_det else None,
-                        "extra_skills": job_det.get("extra_skills") if job_det else None,
-                        "jd_score": job_det.get("match_percentage") if job_det else None,
-                        "total_required_skills": job_det.get("total_required") if job_det else None,
-                        "total_matched_skills": job_det.get("total_matched") if job_det else None
-                    }
+                    "jd_scores": [
+                        {
+                            "index": row["index"],
+                            "final": row["final_score"],
+                            "semantic": row["semantic_score"],
+                            "jd_score": row["match_percentage"],
+                            "matched_skills": row["matched_skills"],
+                            "missing_skills": row["missing_skills"],
+                            "total_required_skills": row["total_required"],
+                            "total_matched_skills": row["total_matched"],
+                        }
+                        for row in result["jd_scores"]
+                    ],
                 }
             }
 
-            return Response(response_data, status=status.HTTP_200_OK)
+            return Response(self.with_timings(request, response_data, timings), status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.exception("Resume processing failed: %s", str(e))
+            logger.exception("Multi-JD resume processing failed: %s", str(e))
             return Response(
                 {
                     "success": False,
@@ -242,9 +406,70 @@ class ResumeAnalysisView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        finally:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+
+class ResumeSearchView(APIView):
+    """Stored resumes ranked against a JD by semantic similarity (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    MAX_RESULTS = 100
+
+    def post(self, request):
+        jd_text = (request.data.get("job_description") or "").replace("\n", " ").strip()
+        try:
+            k = int(request.data.get("k", 10))
+        except (TypeError, ValueError):
+            k = 0
+
+        if not jd_text or not 1 <= k <= self.MAX_RESULTS:
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "INVALID_QUERY",
+                        "message": f"Provide a job_description and k between 1 and {self.MAX_RESULTS}."
+                    }
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            search = model_registry.get("resume_index")
+            started = time.perf_counter()
+            hits = search.search(jd_text, k)
+            took_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            logger.exception("Resume search failed: %s", str(e))
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "INTERNAL_ERROR",
+                        "message": "Something went wrong while searching resumes."
+                    }
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response(
+            {
+                "success": True,
+                "data": {
+                    "searched": len(search),
+                    "took_ms": round(took_ms, 1),
+                    "results": [
+                        {
+                            "resume_id": resume.id,
+                            "semantic_score": score,
+                            "uploaded_at": resume.uploaded_at,
+                        }
+                        for resume, score in hits
+                    ],
+                }
+            },
+            status=status.HTTP_200_OK
+        )
+
+
 class ResumeViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ResumeSerializer
@@ -269,4 +494,40 @@ class ResumeAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return ResumeAnalysis.objects.filter(
             resume__user=self.request.user
-        ).select_related("resume")
\ No newline at end of file
+        ).select_related("resume")
+
+
+class ModelReadinessView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        models = model_registry.status()
+        # Without MODEL_PRELOAD the workers load models on first use, so the
+        # list is only reported. With it, wait until MODEL_WARMUP has loaded
+        # once; a model dropped for idleness later reloads on demand.
+        ready = not settings.MODEL_PRELOAD or all(
+            models.get(name, {}).get("load_count") for name in settings.MODEL_WARMUP
+        )
+        return Response(
+            {"ready": ready, "preload": settings.MODEL_PRELOAD, "models": models},
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class MetricsView(APIView):
+    """Prometheus text format; covers every worker when METRICS_DIR is set.
+
+    Disabled (404) until METRICS_TOKEN is set; scrapers then send it as a
+    bearer token.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+        return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -128,6 +128,57 @@ DATABASES = {
     }
 }
 
+# Core engine model loading
+# Models load lazily on first use. Set MODEL_PRELOAD when running gunicorn
+# with --preload so AppConfig.ready() loads MODEL_WARMUP in the master.
+
+MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+MODEL_WARMUP = [
+    name.strip()
+    for name in os.getenv('MODEL_WARMUP', 'spacy:metrics,spacy:full,sentence_encoder,default_jd_embeddings').split(',')
+    if name.strip()
+]
+
+# JD -> resume search: 0 (default) scores every stored resume exactly. N > 0
+# first shortlists N resumes by mean chunk embedding, which is a loose proxy
+# for max-sim: recall@10 is about 0.68 for N=1000 on 20k resumes
+# (benchmarks/bench_resume_index.py).
+RESUME_INDEX_CANDIDATES = int(os.getenv('RESUME_INDEX_CANDIDATES', '0'))
+
+# Analysis result cache (coreengine.result_cache): extracted text by file
+# hash, skills by text hash + taxonomy version, semantic scores by text + JD
+# + model. RESULT_CACHE_BACKEND: locmem (per worker), file (shared by the
+# workers on one host) or off.
+RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'locmem').lower()
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+if RESULT_CACHE_BACKEND in ('locmem', 'file'):
+    CACHES['results'] = {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if RESULT_CACHE_BACKEND == 'file'
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('RESULT_CACHE_LOCATION') or (
+            str(BASE_DIR / '.cache' / 'results') if RESULT_CACHE_BACKEND == 'file' else 'resume-results'
+        ),
+        'TIMEOUT': int(os.getenv('RESULT_CACHE_TIMEOUT', '86400')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '2000')),
+        },
+    }
+
+# /metrics (Prometheus text format) answers 404 until METRICS_TOKEN is set;
+# scrapers then send "Authorization: Bearer <token>". Set METRICS_DIR (and
+# clear it on start) so every gunicorn worker's numbers are included.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -19,6 +19,7 @@ from django.urls import path,include
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from users.serializer import CustomTokenObtainPairSerializer
+from resume_analysis.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,4 +27,5 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/users/', include('users.urls')),
     path('api/resume-analysis/', include('resume_analysis.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]